@@ -0,0 +1,73 @@
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks.common import make_invoice
+from invoice_generator.aio import AsyncRenderer
+
+
+async def serve(renderer : AsyncRenderer, host : str, port : int, timeout : float):
+    """
+    Minimal HTTP stand-in: every request is answered with a freshly rendered invoice.
+    """
+    async def handle(reader, writer):
+        await reader.readuntil(b"\r\n\r\n")
+        try:
+            pdf = await renderer.render(make_invoice(5), timeout)
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/pdf\r\n")
+            writer.write(f"Content-Length: {len(pdf)}\r\nConnection: close\r\n\r\n".encode())
+            writer.write(pdf)
+        except asyncio.TimeoutError:
+            writer.write(b"HTTP/1.1 504 Gateway Timeout\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+        await writer.drain()
+        writer.close()
+    return await asyncio.start_server(handle, host, port)
+
+async def request(host : str, port : int):
+    start = time.perf_counter()
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(b"GET /invoice HTTP/1.1\r\nHost: localhost\r\n\r\n")
+    await writer.drain()
+    status = (await reader.readline()).split()[1]
+    await reader.read()
+    writer.close()
+    return status == b"200", time.perf_counter() - start
+
+async def run(args):
+    async with AsyncRenderer(workers=args.workers, max_pending=args.max_pending) as renderer:
+        server = await serve(renderer, "127.0.0.1", 0, args.timeout)
+        port = server.sockets[0].getsockname()[1]
+        # Warm up the worker processes
+        await asyncio.gather(*(request("127.0.0.1", port) for _ in range(renderer.workers)))
+
+        tasks = []
+        start = time.perf_counter()
+        for i in range(int(args.rate * args.duration)):
+            await asyncio.sleep(max(0, start + i / args.rate - time.perf_counter()))
+            tasks.append(asyncio.create_task(request("127.0.0.1", port)))
+        results = await asyncio.gather(*tasks)
+        server.close()
+        await server.wait_closed()
+
+    latencies = sorted(latency for ok, latency in results if ok)
+    errors = sum(1 for ok, latency in results if not ok)
+    if len(latencies) < 2:
+        print(f"{errors} requests timed out, not enough successful requests")
+        return
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f"{len(results)} requests at {args.rate}/s: p50 {1000 * quantiles[49]:.1f} ms, "
+          f"p99 {1000 * quantiles[98]:.1f} ms, {errors} timeouts")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the latency of invoice rendering behind a local asyncio HTTP server.")
+    parser.add_argument("--rate", type=float, default=20, help="Requests per second")
+    parser.add_argument("--duration", type=float, default=10, help="Duration of the run in seconds")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes")
+    parser.add_argument("--max-pending", type=int, default=None, help="Maximum number of invoices submitted to the pool")
+    parser.add_argument("--timeout", type=float, default=5, help="Timeout per invoice in seconds")
+    asyncio.run(run(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+from invoice_generator.generator import Invoice
+
+
+LOREM = ("Lorem ipsum dolor sit amet, consectetur adipiscing elit. Sed do eiusmod tempor incididunt ut labore "
+         "et dolore magna aliqua. Ut enim ad minim veniam, quis nostrud exercitation ullamco laboris nisi ut "
+         "aliquip ex ea commodo consequat.")
+
+SVG_LOGO = """
+    <svg version="1.1" width="300" height="200" xmlns="http://www.w3.org/2000/svg">
+        <rect width="100%" height="100%" fill="red" />
+        <circle cx="150" cy="100" r="80" fill="green" />
+        <text x="150" y="125" font-size="60" text-anchor="middle" fill="white">SVG</text>
+    </svg>
+"""
+
+def make_invoice(n_items : int = 10, description : str = LOREM, shipping : bool = True, logo : str = SVG_LOGO, number : int = 1):
+    """
+    Builds a synthetic invoice with `n_items` line items.
+    """
+    invoice = Invoice()
+    invoice.company_name = "SAS Monentreprise"
+    invoice.company_logo = logo
+    invoice.company_VAT_number = "FR 32 123456789"
+    invoice.company_registration_number = "231 190 987 12315"
+    invoice.company_email = "test@gmail.com"
+    invoice.company_address = "1 rue de la paix"
+    invoice.company_zip_city = "75000 Paris"
+    invoice.company_phone = "06 06 06 06 06"
+
+    invoice.customer_number = str(number)
+    invoice.customer_name = "John Doe"
+    invoice.invoice_number = f"2021-{number:06d}"
+    invoice.invoice_date = "01/01/2021"
+    invoice.due_date = "01/02/2021"
+
+    invoice.invoicing_address = "455 Faubourg Saint-Honoré"
+    invoice.invoicing_zip_city = "75000 Paris"
+    invoice.invoicing_phone = "06 06 06 06 06"
+    invoice.invoicing_email = "test2@gmail.com"
+
+    if shipping:
+        invoice.shipping_address = "455 Faubourg Saint-Honoré"
+        invoice.shipping_zip_city = "75000 Paris"
+        invoice.shipping_phone = "06 06 06 06 06"
+        invoice.shipping_email = "test2@gmail.com"
+
+    invoice.items = [["Article", "Quantité", "Prix unitaire (HT)"]]
+    invoice.items += [[f"item{i}", description, 1 + i % 5, 9.99 + i % 7] for i in range(n_items)]
+    invoice.VAT_rate = 20
+    invoice.discount = 0
+    invoice.payment_terms = ["Paiement à réception de facture", "Aucun escompte pour paiement anticipé"]
+    return invoice
+
+def make_svg_logo(n_shapes : int = 2000):
+    """
+    Builds a large SVG logo made of `n_shapes` circles.
+    """
+    circles = "".join(
+        f'<circle cx="{(i * 37) % 300}" cy="{(i * 53) % 200}" r="{1 + i % 9}" fill="#{(i * 2654435761) % 0xffffff:06x}" />'
+        for i in range(n_shapes)
+    )
+    return f'<svg version="1.1" width="300" height="200" xmlns="http://www.w3.org/2000/svg">{circles}</svg>'
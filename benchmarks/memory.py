@@ -0,0 +1,31 @@
+import argparse
+import gc
+import tracemalloc
+
+from benchmarks.common import make_invoice
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the memory held by a billing run kept in memory.")
+    parser.add_argument("--count", type=int, default=100000, help="Number of invoices")
+    parser.add_argument("--items", type=int, default=10, help="Number of line items per invoice")
+    args = parser.parse_args(argv)
+
+    # Dictionaries holding lists of lists, as the invoices were stored before the slotted model
+    rows = _measure(lambda i: make_invoice(args.items, number=i).to_dict(), args.count)
+    slotted = _measure(lambda i: make_invoice(args.items, number=i), args.count)
+    print(f"dict + list of lists: {rows / args.count:8.0f} bytes/invoice")
+    print(f"slotted + ItemList:   {slotted / args.count:8.0f} bytes/invoice ({100 * slotted / rows:.0f}%)")
+
+def _measure(build, count : int):
+    gc.collect()
+    tracemalloc.start()
+    invoices = [build(i) for i in range(count)]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del invoices
+    return size
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+import argparse
+import time
+
+from benchmarks.common import make_invoice
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the rendering speed of invoices with many line items.")
+    parser.add_argument("--items", type=int, nargs="+", default=[100, 1000, 5000, 20000], help="Cart sizes to render")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of renders per cart size, the best one is kept")
+    args = parser.parse_args(argv)
+
+    for n_items in args.items:
+        invoice = make_invoice(n_items)
+        best = min(_time(invoice) for _ in range(args.repeat))
+        print(f"{n_items:>7} items: {best:8.3f}s  {n_items / best:10.0f} rows/s")
+
+def _time(invoice):
+    start = time.perf_counter()
+    invoice.to_bytes()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import argparse
+import statistics
+import subprocess
+import sys
+
+
+# Each scenario runs in a fresh interpreter and prints its duration in seconds
+SCENARIOS = {
+    "import": "import invoice_generator.generator",
+    "import + preload": "import invoice_generator.generator as g; g.preload()",
+    "first invoice": "from benchmarks.common import make_invoice; make_invoice().to_bytes()",
+}
+
+SCRIPT = """
+import time
+start = time.perf_counter()
+{code}
+print(time.perf_counter() - start)
+"""
+
+def _run(code : str):
+    output = subprocess.run([sys.executable, "-c", SCRIPT.format(code=code)], check=True, capture_output=True, text=True)
+    return float(output.stdout)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the cold start of the generator in fresh processes.")
+    parser.add_argument("--repeat", type=int, default=10, help="Number of processes per scenario, the median is kept")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, code in SCENARIOS.items():
+        results[name] = statistics.median(_run(code) for _ in range(args.repeat))
+        print(f"{name:>16}: {1000 * results[name]:7.1f} ms")
+    # "import + preload" is the cost of importing every dependency eagerly
+    saved = results["import + preload"] - results["import"]
+    print(f"Lazy imports save {1000 * saved:.1f} ms to processes that do not draw invoices")
+
+
+if __name__ == "__main__":
+    main()
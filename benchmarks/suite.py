@@ -0,0 +1,99 @@
+import argparse
+import multiprocessing
+import platform
+import resource
+import sys
+import time
+
+import rapidjson
+
+from benchmarks.common import LOREM, make_invoice, make_svg_logo
+from invoice_generator.instrumentation import RenderStats
+
+
+# name: (number of items, description, with shipping address, large logo)
+SHAPES = {
+    "few_items": (5, LOREM, True, False),
+    "many_items": (2000, LOREM, True, False),
+    "long_descriptions": (50, LOREM * 10, True, False),
+    "no_shipping": (5, LOREM, False, False),
+    "large_logo": (5, LOREM, True, True),
+}
+PHASES = ("details", "logo", "items", "totals", "save")
+
+def run_shape(name : str, min_time : float, min_count : int):
+    """
+    Renders invoices of the given shape for at least `min_time` seconds and `min_count` invoices.
+    Runs in a fresh process, so that the peak RSS is the one of this shape only.
+    """
+    n_items, description, shipping, large_logo = SHAPES[name]
+    logo = make_svg_logo() if large_logo else None
+    invoices = [make_invoice(n_items, description, shipping, number=i, **({"logo": logo} if logo else {})) for i in range(min_count)]
+
+    invoices[0].to_bytes()
+
+    stats = RenderStats()
+    count = 0
+    start = time.perf_counter()
+    while count < min_count or time.perf_counter() - start < min_time:
+        invoices[count % len(invoices)].to_bytes(stats=stats)
+        count += 1
+    elapsed = time.perf_counter() - start
+
+    return {
+        "invoices": count,
+        "wall_time": elapsed,
+        "invoices_per_second": count / elapsed,
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "output_bytes": stats.counters["bytes"] // count,
+        "pages": stats.counters["pages"] / count,
+        "phases": {phase: stats.timings.get(phase, 0.0) / count for phase in PHASES},
+    }
+
+def compare(results : dict, baseline : dict, threshold : float):
+    """
+    Prints the shapes whose throughput dropped by more than `threshold` compared to `baseline`.
+    Returns the number of regressions.
+    """
+    regressions = 0
+    for name, result in results["shapes"].items():
+        previous = baseline["shapes"].get(name)
+        if previous is None:
+            continue
+        ratio = result["invoices_per_second"] / previous["invoices_per_second"]
+        if ratio < 1 - threshold:
+            regressions += 1
+            print(f"Regression: {name} is {100 * (1 - ratio):.0f}% slower than the baseline")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the rendering pipeline on invoices of various shapes.")
+    parser.add_argument("--shapes", nargs="+", choices=SHAPES, default=list(SHAPES), help="Shapes to benchmark")
+    parser.add_argument("--min-time", type=float, default=2, help="Minimum duration per shape in seconds")
+    parser.add_argument("--min-count", type=int, default=3, help="Minimum number of invoices per shape")
+    parser.add_argument("--json", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare with the results of a previous run")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Throughput drop reported as a regression")
+    args = parser.parse_args(argv)
+
+    results = {"python": sys.version.split()[0], "platform": platform.platform(), "shapes": {}}
+    context = multiprocessing.get_context("spawn")
+    for name in args.shapes:
+        with context.Pool(1) as pool:
+            result = pool.apply(run_shape, (name, args.min_time, args.min_count))
+        results["shapes"][name] = result
+        phases = "  ".join(f"{phase} {1000 * duration:.1f}ms" for phase, duration in result["phases"].items())
+        print(f"{name:>18}: {result['invoices_per_second']:8.1f} invoices/s  {result['peak_rss_kb'] / 1024:6.1f} MiB RSS  "
+              f"{result['output_bytes'] / 1024:7.1f} KiB  {phases}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            f.write(rapidjson.dumps(results, indent=2))
+    if args.baseline:
+        with open(args.baseline) as f:
+            return 1 if compare(results, rapidjson.loads(f.read()), args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
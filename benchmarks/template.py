@@ -0,0 +1,50 @@
+import argparse
+import time
+
+from benchmarks.common import SVG_LOGO, make_invoice, make_svg_logo
+from invoice_generator.generator import InvoiceTemplate
+from invoice_generator.logo import LOGO_CACHE
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the per-invoice cost of drawing the static parts of every invoice and of a shared template.")
+    parser.add_argument("--count", type=int, default=10000, help="Number of invoices from the same seller")
+    parser.add_argument("--items", type=int, default=5, help="Number of line items per invoice")
+    parser.add_argument("--large-logo", action="store_true", help="Use a large SVG logo")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of alternated runs, the best one is reported")
+    args = parser.parse_args(argv)
+
+    logo = make_svg_logo() if args.large_logo else SVG_LOGO
+    invoices = [make_invoice(args.items, logo=logo, number=i) for i in range(args.count)]
+
+    # Everything static is drawn for every invoice: the logo, the seller block and the footer.
+    # The measurement caches stay warm, as for the other cases
+    def redraw(invoice):
+        LOGO_CACHE.clear()
+        invoice.to_bytes(InvoiceTemplate(invoice))
+    # The logo is compiled once, the seller block and the footer are drawn for every invoice
+    def fresh(invoice):
+        invoice.to_bytes(InvoiceTemplate(invoice))
+    # The seller template is compiled once for the whole run
+    template = InvoiceTemplate(invoices[0])
+    def shared(invoice):
+        invoice.to_bytes(template)
+
+    # Warm up the measurement caches, so that only the cost of the static parts is compared
+    for invoice in invoices[:10]:
+        fresh(invoice)
+
+    cases = (("redraw", redraw), ("fresh", fresh), ("shared", shared))
+    best = {name: float("inf") for name, _ in cases}
+    for _ in range(args.repeat):
+        for name, render in cases:
+            start = time.perf_counter()
+            for invoice in invoices:
+                render(invoice)
+            best[name] = min(best[name], time.perf_counter() - start)
+    for name, elapsed in best.items():
+        print(f"{name:>8}: {elapsed:8.2f}s  {1000 * elapsed / args.count:6.2f} ms/invoice")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import argparse
+import time
+
+from benchmarks.common import make_invoice
+from invoice_generator.totals import compute_totals, load_numpy
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the computation of invoice totals for large carts.")
+    parser.add_argument("--items", type=int, default=20000, help="Number of line items")
+    parser.add_argument("--repeat", type=int, default=20, help="Number of computations, the best one is kept")
+    args = parser.parse_args(argv)
+
+    invoice = make_invoice(args.items)
+    rows = invoice.items.to_rows()
+
+    # Floating point sums over the list of lists, as done before the totals engine
+    def floats():
+        subtotal = sum(item[2]*item[3] for item in rows[1:])
+        [item[2]*item[3] for item in rows[1:]]
+        return subtotal * (1 + invoice.VAT_rate/100) - invoice.discount
+    def exact():
+        return compute_totals(invoice.items, invoice.VAT_rate, invoice.discount)
+
+    print(f"{args.items} items, NumPy {'enabled' if load_numpy() is not None else 'not installed'}")
+    for name, compute in (("floats", floats), ("exact", exact)):
+        best = min(_time(compute) for _ in range(args.repeat))
+        print(f"{name:>8}: {1000 * best:8.2f} ms")
+
+def _time(compute):
+    start = time.perf_counter()
+    compute()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    main()
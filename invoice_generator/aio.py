@@ -0,0 +1,73 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from invoice_generator.generator import Invoice, preload
+
+
+def _render_bytes(invoice : Invoice):
+    return invoice.to_bytes()
+
+class AsyncRenderer:
+    def __init__(self, workers : int = None, max_pending : int = None):
+        """
+        Renders invoices from an asyncio event loop, in a pool of worker processes.
+
+        workers : The number of worker processes. Defaults to the number of CPUs.
+        max_pending : The maximum number of invoices submitted to the pool at once. Defaults to twice the number of workers.
+                      Further calls to render wait for a free slot, which applies backpressure to the callers.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 2 * self.workers
+        self._executor = None
+        self._slots = None
+
+    async def render(self, invoice : Invoice, timeout : float = None) -> bytes:
+        """
+        Renders the invoice and returns the PDF bytes.
+
+        timeout : The maximum time in seconds to wait for the invoice, including the time spent waiting for a free slot.
+                  asyncio.TimeoutError is raised when it expires.
+        On cancellation or timeout, the invoice is withdrawn from the pool if its rendering did not start yet.
+        """
+        return await asyncio.wait_for(self._render(invoice), timeout)
+
+    async def _render(self, invoice : Invoice):
+        if self._executor is None:
+            # Forking a process that runs an event loop would leak its sockets and loop state to the workers
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context(method), initializer=preload)
+            self._slots = asyncio.Semaphore(self.max_pending)
+        async with self._slots:
+            future = self._executor.submit(_render_bytes, invoice)
+            try:
+                return await asyncio.wrap_future(future)
+            finally:
+                future.cancel()
+
+    async def close(self):
+        """
+        Shuts the worker pool down. Invoices waiting in the pool are cancelled.
+        """
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.get_running_loop().run_in_executor(None, lambda: executor.shutdown(cancel_futures=True))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+_default_renderer = None
+
+async def render_async(invoice : Invoice, timeout : float = None) -> bytes:
+    """
+    Renders the invoice in the shared AsyncRenderer of the process and returns the PDF bytes.
+    """
+    global _default_renderer
+    if _default_renderer is None:
+        _default_renderer = AsyncRenderer()
+    return await _default_renderer.render(invoice, timeout)
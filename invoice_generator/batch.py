@@ -0,0 +1,246 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
+
+import rapidjson
+
+from invoice_generator.generator import Invoice
+from invoice_generator.ingest import iter_jsonl, parse_record
+from invoice_generator.mailing import render_mailing
+from invoice_generator.render_cache import RenderCache
+
+
+DEFAULT_CHUNKSIZE = 32
+
+class BatchResult:
+    def __init__(self):
+        """
+        Summary of a batch rendering run.
+
+        Attributes:
+        - rendered: The list of paths of the generated .pdf files.
+        - errors: The list of (index, message) tuples for the invoices that could not be rendered.
+        - cached: The number of invoices served from the render cache.
+        - output_bytes: The total size of the generated files.
+        - elapsed: The wall time of the run, in seconds.
+        """
+        self.rendered = []
+        self.errors = []
+        self.cached = 0
+        self.output_bytes = 0
+        self.elapsed = 0.0
+
+    @property
+    def total(self):
+        return len(self.rendered) + len(self.errors)
+
+    @property
+    def invoices_per_second(self):
+        return len(self.rendered) / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self):
+        """
+        Returns a one-line human readable summary of the run.
+        """
+        return (f"{len(self.rendered)}/{self.total} invoices rendered ({self.cached} from cache), {len(self.errors)} failed "
+                f"in {self.elapsed:.2f}s ({self.invoices_per_second:.1f} invoices/s, "
+                f"{self.output_bytes / 1024 / 1024:.1f} MiB)")
+
+
+def _to_invoice(payload):
+    if isinstance(payload, Invoice):
+        return payload
+    if isinstance(payload, dict):
+        payload = rapidjson.dumps(payload)
+    # Validated against INVOICE_SCHEMA, so that a missing field is reported instead of rendering an incomplete invoice
+    record = parse_record(payload)
+    if not record.ok:
+        raise ValueError(record.error)
+    return record.invoice
+
+def _invoice_number(payload):
+    if isinstance(payload, Invoice):
+        return payload.invoice_number
+    if isinstance(payload, (str, bytes)):
+        try:
+            payload = rapidjson.loads(payload)
+        except ValueError:
+            return None
+    return payload.get("invoice_number") if isinstance(payload, dict) else None
+
+def _output_name(number, index : int):
+    name = "" if number is None else str(number).strip()
+    for separator in (os.sep, os.altsep):
+        if separator:
+            name = name.replace(separator, "_")
+    # "", "." and ".." are not file names
+    return name if name.strip(".") else f"invoice_{index}"
+
+def _named_chunks(invoices, chunksize : int, result : BatchResult):
+    """
+    Yields chunks of (index, payload, name) tuples. Names are given in input order, before anything is rendered:
+    an invoice whose output file is already claimed by a previous one is reported in `result.errors` and skipped.
+    """
+    claimed = {}
+    for chunk in _chunks(invoices, chunksize):
+        named = []
+        for index, payload in chunk:
+            name = _output_name(_invoice_number(payload), index)
+            first = claimed.setdefault(name, index)
+            if first == index:
+                named.append((index, payload, name))
+            else:
+                result.errors.append((index, f"ValueError: {name}.pdf is already the output of invoice #{first}"))
+        if named:
+            yield named
+
+# Render caches of the process, by directory
+_caches = {}
+
+def _render_cache(cache_dir : str):
+    cache = _caches.get(cache_dir)
+    if cache is None:
+        cache = _caches[cache_dir] = RenderCache(cache_dir)
+    return cache
+
+def _render_chunk(chunk, out_dir : str, cache_dir : str = None):
+    """
+    Renders a chunk of (index, payload, name) tuples. Errors are captured per invoice
+    so that a single bad record does not abort the whole chunk.
+    """
+    cache = _render_cache(cache_dir) if cache_dir is not None else None
+    results = []
+    for index, payload, name in chunk:
+        try:
+            invoice = _to_invoice(payload)
+            path = os.path.join(out_dir, name)
+            cached = False
+            if cache is None:
+                invoice.generate_pdf(path)
+            else:
+                hits = cache.hits
+                cache.generate_pdf(invoice, path)
+                cached = cache.hits > hits
+            path += ".pdf"
+            results.append((index, path, os.path.getsize(path), cached, None))
+        except Exception as e:
+            results.append((index, None, 0, False, f"{type(e).__name__}: {e}"))
+    return results
+
+def _chunks(invoices, chunksize : int):
+    iterator = enumerate(invoices)
+    while True:
+        chunk = list(islice(iterator, chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+def _collect(result : BatchResult, chunk_results):
+    for index, path, size, cached, error in chunk_results:
+        if error is None:
+            result.rendered.append(path)
+            result.output_bytes += size
+            result.cached += cached
+        else:
+            result.errors.append((index, error))
+
+def render_batch(invoices, out_dir : str, workers : int = None, chunksize : int = DEFAULT_CHUNKSIZE, cache_dir : str = None):
+    """
+    Renders many invoices to .pdf files in `out_dir`, fanning them out across a process pool.
+
+    invoices : An iterable of Invoice objects, decoded JSON objects or JSON strings, validated against INVOICE_SCHEMA. It is consumed lazily.
+    out_dir : The directory the .pdf files are written to. Files are named after the invoice number, invoices whose
+              number is already used by a previous invoice of the batch are reported in `errors` instead of overwriting it.
+    workers : The number of worker processes. Defaults to the number of CPUs. With 1, invoices are rendered in-process.
+    chunksize : The number of invoices sent to a worker at once.
+    cache_dir : An optional RenderCache directory. Invoices that did not change since they were cached are not rendered again.
+
+    Returns a BatchResult. Invoices that fail to render are reported in `errors` instead of aborting the run.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    result = BatchResult()
+    start = time.perf_counter()
+
+    if workers == 1:
+        for chunk in _named_chunks(invoices, chunksize, result):
+            _collect(result, _render_chunk(chunk, out_dir, cache_dir))
+    else:
+        # Only keep a bounded number of chunks in flight so that memory stays flat for large inputs
+        max_pending = 2 * workers
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = set()
+            for chunk in _named_chunks(invoices, chunksize, result):
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        _collect(result, future.result())
+                pending.add(executor.submit(_render_chunk, chunk, out_dir, cache_dir))
+            for future in pending:
+                _collect(result, future.result())
+
+    result.errors.sort()
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def iter_source(path : str, on_error = None):
+    """
+    Lazily yields validated Invoice objects from `path`, which is either a directory
+    of .json files (one invoice per file) or a JSON Lines file (one invoice per line).
+    on_error : Called with (location, message) for each invalid invoice, which is skipped.
+    """
+    if os.path.isdir(path):
+        for file_name in sorted(os.listdir(path)):
+            if file_name.endswith(".json"):
+                with open(os.path.join(path, file_name), "rb") as f:
+                    record = parse_record(f.read())
+                if record.ok:
+                    yield record.invoice
+                elif on_error is not None:
+                    on_error(file_name, record.error)
+    else:
+        for record in iter_jsonl(path):
+            if record.ok:
+                yield record.invoice
+            elif on_error is not None:
+                on_error(f"line {record.line_number}", record.error)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render a batch of invoices to .pdf files.")
+    parser.add_argument("source", help="A directory of .json invoices or a .jsonl file")
+    parser.add_argument("out_dir", help="The output directory")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Number of worker processes (default: number of CPUs)")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="Invoices sent to a worker at once")
+    parser.add_argument("--cache", metavar="DIR", default=None, help="Render cache directory: unchanged invoices are not rendered again")
+    parser.add_argument("--single-pdf", metavar="NAME", default=None, help="Render all the invoices in-process into out_dir/NAME.pdf")
+    args = parser.parse_args(argv)
+
+    invalid = []
+    def on_error(location, message):
+        invalid.append(location)
+        print(f"Error: {location}: {message}")
+
+    if args.single_pdf is not None:
+        os.makedirs(args.out_dir, exist_ok=True)
+        start = time.perf_counter()
+        page_ranges = render_mailing(iter_source(args.source, on_error), os.path.join(args.out_dir, f"{args.single_pdf}.pdf"))
+        pages = sum(page_count for _, _, page_count in page_ranges)
+        print(f"{len(page_ranges)} invoices rendered in {pages} pages in {time.perf_counter() - start:.2f}s")
+        if invalid:
+            print(f"{len(invalid)} invalid invoices skipped")
+        return 1 if invalid else 0
+
+    result = render_batch(iter_source(args.source, on_error), args.out_dir, workers=args.workers, chunksize=args.chunksize, cache_dir=args.cache)
+    for index, error in result.errors:
+        print(f"Error: invoice #{index}: {error}")
+    print(result.summary())
+    if invalid:
+        print(f"{len(invalid)} invalid invoices skipped")
+    return 1 if result.errors or invalid else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
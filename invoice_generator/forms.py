@@ -0,0 +1,138 @@
+import io
+
+from reportlab.pdfgen import canvas
+from reportlab.pdfbase import pdfdoc
+
+
+class CompiledForm:
+    __slots__ = ("name", "bbox", "content", "fonts", "ext_gstate", "dependencies")
+
+    def __init__(self, name : str, bbox : tuple, content : bytes, fonts : dict, ext_gstate = None, dependencies = ()):
+        """
+        A PDF Form XObject drawn and compressed once, then registered as is in every document it is used in,
+        without drawing it again. Built by compile_form.
+
+        Attributes:
+        - name: The name of the form, as passed to canvas.doForm.
+        - bbox: The (lowerx, lowery, upperx, uppery) bounding box of the form.
+        - content: The compressed operator stream of the form.
+        - fonts: The names of the fonts used by the stream, mapped to the fonts they stand for.
+        - ext_gstate: The graphics states (e.g. transparency) used by the stream, or None.
+        - dependencies: The CompiledForm and image XObjects drawn by the stream, registered along with it.
+        """
+        self.name = name
+        self.bbox = bbox
+        self.content = content
+        self.fonts = fonts
+        self.ext_gstate = ext_gstate
+        self.dependencies = dependencies
+
+    def define(self, c : canvas.Canvas):
+        """
+        Registers the form and its dependencies in the document of the canvas, unless it already exists.
+        """
+        document = c._doc
+        name = document.getXObjectName(self.name)
+        if name in document.idToObject:
+            return
+        for dependency in self.dependencies:
+            if isinstance(dependency, CompiledForm):
+                dependency.define(c)
+            else:
+                register_image(c, dependency)
+        resources = pdfdoc.PDFResourceDictionary()
+        resources.allProcs()
+        # Fonts are numbered in the order they are first used in a document: the names of the stream are
+        # mapped to the fonts of this document
+        resources.Font = {
+            font_name: pdfdoc.PDFObjectReference(document.getInternalFontName(font)[1:])
+            for font_name, font in self.fonts.items()
+        }
+        resources.XObject = {
+            document.getXObjectName(dependency.name): pdfdoc.PDFObjectReference(document.getXObjectName(dependency.name))
+            for dependency in self.dependencies
+        }
+        if self.ext_gstate is not None:
+            resources.ExtGState = self.ext_gstate
+        document.Reference(_FormXObject(self, resources), name)
+
+    def draw(self, c : canvas.Canvas):
+        """
+        Draws the form in the current graphics state of the canvas.
+        """
+        self.define(c)
+        c.doForm(self.name)
+
+
+class _FormXObject(pdfdoc.PDFObject):
+    __Comment__ = "compiled xobject form"
+
+    def __init__(self, form : CompiledForm, resources : pdfdoc.PDFResourceDictionary):
+        self.form = form
+        self.resources = resources
+
+    def format(self, document):
+        stream = pdfdoc.PDFStream(content=self.form.content)
+        dictionary = stream.dictionary
+        dictionary["Type"] = pdfdoc.PDFName("XObject")
+        dictionary["Subtype"] = pdfdoc.PDFName("Form")
+        dictionary["FormType"] = 1
+        dictionary["BBox"] = pdfdoc.PDFArray(list(self.form.bbox))
+        dictionary["Matrix"] = pdfdoc.PDFArray([1, 0, 0, 1, 0, 0])
+        dictionary["Resources"] = self.resources
+        # Compressed once by compile_form
+        dictionary["Filter"] = pdfdoc.PDFArray([pdfdoc.PDFName(pdfdoc.PDFZCompress.pdfname)])
+        return stream.format(document)
+
+
+def compile_form(name : str, draw, bbox : tuple):
+    """
+    Draws a form on a scratch canvas with draw(c) and returns it as a CompiledForm.
+    `draw` may use fonts, images and other compiled forms, which are registered along with the form.
+    """
+    c = canvas.Canvas(io.BytesIO())
+    c.beginForm(name, *bbox)
+    draw(c)
+    c.endForm()
+    document = c._doc
+    form = document.idToObject[document.getXObjectName(name)]
+    dependencies = []
+    for xobject_name in (form.XObjects.dict if form.XObjects else ()):
+        dependency = document.idToObject[xobject_name]
+        if isinstance(dependency, _FormXObject):
+            dependencies.append(dependency.form)
+        elif isinstance(dependency, pdfdoc.PDFImageXObject):
+            dependencies.append(dependency)
+        else:
+            raise ValueError(f"Form {name!r} draws {xobject_name!r}, which is neither a compiled form nor an image")
+    return CompiledForm(
+        name,
+        tuple(bbox),
+        pdfdoc.PDFZCompress.encode(form.stream),
+        {internal_name[1:]: font for font, internal_name in document.fontMapping.items()},
+        form.ExtGState,
+        tuple(dependencies),
+    )
+
+
+def register_image(c : canvas.Canvas, image : pdfdoc.PDFImageXObject):
+    """
+    Registers an image XObject compressed once in the document of the canvas, unless it already exists.
+    """
+    # Same registration as canvas.drawImage, without decoding and compressing the image again
+    document = c._doc
+    name = document.getXObjectName(image.name)
+    if document.idToObject.get(name) is not None:
+        return
+    smask = getattr(image, "_smask", None) or getattr(image, "_shared_smask", None)
+    for obj in (image, smask):
+        # The objects are shared by every document and carry the name they were registered under in the previous one
+        if obj is not None:
+            vars(obj).pop("__InternalName__", None)
+    document.Reference(image, name)
+    if smask is not None:
+        # The soft mask (alpha channel) is kept aside so that it can be registered in every document
+        image._shared_smask = smask
+        if hasattr(image, "_smask"):
+            del image._smask
+        image.smask = document.Reference(smask, document.getXObjectName(smask.name))
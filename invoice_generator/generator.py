@@ -1,12 +1,24 @@
+import base64
+import hashlib
+import importlib
+import io
+import os
+from collections import OrderedDict
+
 from reportlab.lib.units import mm
 from reportlab.pdfgen import canvas
-from reportlab.lib.utils import simpleSplit
-from reportlab.graphics import renderPDF
-from reportlab.platypus import Table, TableStyle, Paragraph
 from reportlab.lib import colors
-from svglib.svglib import svg2rlg, SvgRenderer
 import rapidjson
-from lxml import etree
+
+from invoice_generator.forms import compile_form
+from invoice_generator.instrumentation import NO_STATS
+from invoice_generator.locales import DEFAULT_CURRENCY, DEFAULT_LANGUAGE, get_locale
+# MAX_DRAWING_SIZE is re-exported, it used to be defined in this module
+from invoice_generator.logo import LOGO_CACHE, MAX_DRAWING_SIZE  # noqa: F401
+from invoice_generator.measure import string_width, wrap_paragraph
+from invoice_generator.models import as_item_list
+from invoice_generator.pagination import cell_width, paginate, row_height
+from invoice_generator.totals import compute_totals, load_numpy
 
 
 # DEFINE LAYOUT CONSTANTS
@@ -15,7 +27,6 @@ MARGIN_TOP = 20*mm
 MARGIN_BOTTOM = 20*mm
 MARGIN_LEFT = 15*mm
 MARGIN_RIGHT = 15*mm
-MAX_DRAWING_SIZE = 150
 LINE_SPACE = 2
 VERTICAL_SPACING = 15*mm
 HORIZONTAL_SPACING = 15*mm
@@ -23,7 +34,42 @@ HORIZONTAL_SPACING = 15*mm
 # Set the selected format. Other formats can be found in reportlab.lib.pagesizes
 format = A4
 
+# Version of the rendered output, part of the keys of the render cache. Bump it when a change alters the PDF of an invoice
+LAYOUT_VERSION = 4
+
+INVOICE_FIELDS = (
+    "company_name",
+    "company_logo",
+    "company_VAT_number",
+    "company_registration_number",
+    "company_email",
+    "company_address",
+    "company_zip_city",
+    "company_phone",
+    "customer_number",
+    "customer_name",
+    "invoice_number",
+    "invoice_date",
+    "due_date",
+    "invoicing_address",
+    "invoicing_zip_city",
+    "invoicing_phone",
+    "invoicing_email",
+    "shipping_address",
+    "shipping_zip_city",
+    "shipping_phone",
+    "shipping_email",
+    "items",
+    "VAT_rate",
+    "discount",
+    "payment_terms",
+    "language",
+    "currency",
+)
+
 class Invoice:
+    __slots__ = tuple(field for field in INVOICE_FIELDS if field != "items") + ("_items", "_totals")
+
     def __init__(self):
         """
         Initializes an instance of the InvoiceGenerator class.
@@ -50,10 +96,12 @@ class Invoice:
         - shipping_zip_city: The ZIP code and city for shipping.
         - shipping_phone: The phone number for shipping.
         - shipping_email: The email address for shipping.
-        - items: The list of items in the invoice.
+        - items: The items in the invoice, stored as an ItemList. A list of lists with a header row is converted on assignment.
         - VAT_rate: The VAT rate for the invoice.
         - discount: The discount for the invoice.
         - payment_terms: The payment terms for the invoice.
+        - language: The language of the labels: "fr" (default), "en" or "de".
+        - currency: The ISO 4217 code of the currency of the amounts, "EUR" by default.
         """
         self.company_name = ""
         self.company_logo = ""
@@ -85,93 +133,83 @@ class Invoice:
         self.VAT_rate = 0
         self.discount = 0
         self.payment_terms = []
+        self.language = DEFAULT_LANGUAGE
+        self.currency = DEFAULT_CURRENCY
 
-    def _generate_footer(self, c: canvas.Canvas):
-        c.resetTransforms()
-        c.translate(MARGIN_LEFT, MARGIN_BOTTOM)
-        c.setFillColorRGB(0.5,0.5,0.5)
-        c.setFont("Helvetica",8)
-        c.drawCentredString(0.5 * format[0] - MARGIN_LEFT, -0.5 * MARGIN_BOTTOM, f' {self.company_name} RCS {self.company_registration_number} - Numéro de TVA intracommunautaire {self.company_VAT_number}')
+    @property
+    def items(self):
+        return self._items
+
+    @items.setter
+    def items(self, items):
+        self._items = as_item_list(items)
+        self._totals = None
+
+    def totals(self):
+        """
+        Returns the Totals of the invoice (amounts in cents), computed once and cached.
+        The cache is reset when `items`, `VAT_rate` or `discount` are assigned. Items modified in place
+        after the totals were computed require assigning `items` again.
+        """
+        key = (self.VAT_rate, self.discount)
+        if self._totals is None or self._totals[0] != key:
+            self._totals = (key, compute_totals(self._items, self.VAT_rate, self.discount))
+        return self._totals[1]
+
+    def to_dict(self):
+        """
+        Returns the invoice as a JSON serializable dictionary, in the format read by generate_from_dict.
+        """
+        data = {field: getattr(self, field) for field in INVOICE_FIELDS}
+        data["items"] = self._items.to_rows()
+        if isinstance(self.company_logo, (bytes, bytearray)):
+            data["company_logo"] = base64.b64encode(self.company_logo).decode("ascii")
+        return data
 
-    def _generate_header(self, c: canvas.Canvas, current_page: int, total_pages: int):
+    def _generate_header(self, c: canvas.Canvas, template, current_page: int, total_pages: int):
         c.resetTransforms()
         c.setFillColorRGB(0.5,0.5,0.5)
         c.setFont("Helvetica",8)
         c.translate(MARGIN_LEFT, format[1] - 0.5 * MARGIN_TOP)
-        c.drawString(0, 0, f"Page {current_page}/{total_pages}")
+        c.drawString(0, 0, template.locale["page"].format(page=current_page, pages=total_pages))
         c.drawRightString(format[0] - MARGIN_LEFT - MARGIN_RIGHT, 0 , f' {self.invoice_number}')
 
-    def _generate_details(self, c : canvas.Canvas):
-
+    def _generate_details(self, c : canvas.Canvas, template, stats):
         c.translate(MARGIN_LEFT, format[1] - MARGIN_TOP)
-
-        svg_root = etree.fromstring(self.company_logo)
-        svgRenderer = SvgRenderer('')
-        drawing = svgRenderer.render(svg_root)
-
-        width = drawing.width
-        height = drawing.height
-        max_dimension = max(width, height)
-        scale = MAX_DRAWING_SIZE/max_dimension
-        if max_dimension > MAX_DRAWING_SIZE:
-            drawing.scale(scale, scale)
-
-        renderPDF.draw(
-            drawing, 
-            c, 
-            0,
-            - drawing.height * scale
-        )
-        c.translate(0, -drawing.height*scale)
-
-        # Draw company details
-        company_details_offset = c.stringWidth(f"{self.company_name}", "Helvetica-Bold", 18)
-        for text in (f"{self.company_address}", f"{self.company_zip_city}", f"{self.company_phone}", f"{self.company_email}"):
-            company_details_offset = max(company_details_offset, c.stringWidth(text, "Helvetica", 12))
-
-        c.setFont("Helvetica-Bold", 18)
-        c.translate(0, - VERTICAL_SPACING)
-        c.drawString(0, 0, f"{self.company_name}")
-        c.setFont("Helvetica", 12)
-        c.translate(0, - 12 - LINE_SPACE)
-        c.drawString(0, 0, f"{self.company_address}")
-        c.translate(0, - 12 - LINE_SPACE)
-        c.drawString(0, 0, f"{self.company_zip_city}")
-        c.translate(0, - 12 - LINE_SPACE)
-        c.drawString(0, 0, f"{self.company_phone}")
-        c.translate(0, - 12 - LINE_SPACE)
-        c.drawString(0, 0, f"{self.company_email}")
-        c.translate(0, - 12 - LINE_SPACE)
+        template.draw_seller(c, stats)
         c.resetTransforms()
 
-        customer_details_offset = c.stringWidth(f"Facture n°{self.invoice_number}", "Helvetica-Bold", 16)
-        for text in (f"Numéro de client: {self.customer_number}",f"Date: {self.invoice_date}", f"Echéance: {self.due_date}", f"Client: {self.customer_name}"):
-            customer_details_offset = max(customer_details_offset, c.stringWidth(text, "Helvetica", 12))
+        locale = template.locale
+        # The widths of the labels are measured once per locale, only the values are measured here
+        widths = locale.widths
+        customer_details_offset = widths["invoice"] + string_width(f"{self.invoice_number}", "Helvetica-Bold", 16)
+        for label, value in (("customer_number", self.customer_number), ("date", self.invoice_date), ("due_date", self.due_date), ("customer", self.customer_name)):
+            customer_details_offset = max(customer_details_offset, widths[label] + string_width(f"{value}", "Helvetica", 12))
 
         c.translate(format[0] - MARGIN_RIGHT - customer_details_offset, format[1] -  MARGIN_TOP - 0.5 * VERTICAL_SPACING )
         c.setFont("Helvetica-Bold", 16)
-        c.drawString(0, 0, f"Facture n°{self.invoice_number}")
+        c.drawString(0, 0, f"{locale['invoice']}{self.invoice_number}")
         c.translate(0, - 16 - LINE_SPACE)
         c.setFont("Helvetica", 12)
         if (self.customer_number != ""):
-            c.drawString(0, 0, f"Numéro de client: {self.customer_number}")
+            c.drawString(0, 0, f"{locale['customer_number']}{self.customer_number}")
             c.translate(0, - 12 - LINE_SPACE)
-        c.drawString(0, 0, f"Date: {self.invoice_date}")
+        c.drawString(0, 0, f"{locale['date']}{self.invoice_date}")
         c.translate(0, - 12 - LINE_SPACE)
-        c.drawString(0, 0, f"Echéance: {self.due_date}")
+        c.drawString(0, 0, f"{locale['due_date']}{self.due_date}")
         c.translate(0, - 12 - LINE_SPACE)
-        c.drawString(0, 0, f"Client: {self.customer_name}")
+        c.drawString(0, 0, f"{locale['customer']}{self.customer_name}")
 
-        invoice_details_offset = c.stringWidth(f"Addresse de", "Helvetica-Bold", 12)
+        invoice_details_offset = locale.address_width
         for text in (f"{self.invoicing_address}", f"{self.invoicing_zip_city}", f"{self.invoicing_phone}", f"{self.invoicing_email}"):
-            invoice_details_offset = max(invoice_details_offset, c.stringWidth(text, "Helvetica", 10))
+            invoice_details_offset = max(invoice_details_offset, string_width(text, "Helvetica", 10))
 
         c.translate(customer_details_offset - invoice_details_offset, - 12 - LINE_SPACE - 0.5 * VERTICAL_SPACING)
         c.saveState()
         c.setFont("Helvetica-Bold", 12)
-        c.drawString(0, 0, f"Adresse de")
+        c.drawString(0, 0, locale["invoicing_address"][0])
         c.translate(0, - 12 - LINE_SPACE)
-        c.drawString(0, 0, f"facturation")
+        c.drawString(0, 0, locale["invoicing_address"][1])
         c.setFont("Helvetica", 10)
         c.translate(0, - 14 - LINE_SPACE)
         if (self.invoicing_address != ""):
@@ -187,15 +225,15 @@ class Invoice:
 
         if (self.shipping_address != "" or self.shipping_zip_city != "" or self.shipping_phone != "" or self.shipping_email != ""):
             c.restoreState()
-            shipping_details_offset = c.stringWidth(f"Addresse de", "Helvetica-Bold", 12)
+            shipping_details_offset = locale.address_width
             for text in (f"{self.shipping_address}", f"{self.shipping_zip_city}", f"{self.shipping_phone}", f"{self.shipping_email}"):
-                shipping_details_offset = max(shipping_details_offset, c.stringWidth(text, "Helvetica", 10))
+                shipping_details_offset = max(shipping_details_offset, string_width(text, "Helvetica", 10))
             
             c.translate(- shipping_details_offset - HORIZONTAL_SPACING,0)
             c.setFont("Helvetica-Bold", 12)
-            c.drawString(0, 0, f"Adresse de")
+            c.drawString(0, 0, locale["shipping_address"][0])
             c.translate(0, - 12 - LINE_SPACE)
-            c.drawString(0, 0, f"livraison")
+            c.drawString(0, 0, locale["shipping_address"][1])
             c.setFont("Helvetica", 10)
             c.translate(0, - 14 - LINE_SPACE)
             if (self.shipping_address != ""):
@@ -215,69 +253,120 @@ class Invoice:
             c.translate(invoice_details_offset, - VERTICAL_SPACING)
         c.translate(-format[0] + MARGIN_LEFT + MARGIN_RIGHT, 0)
 
-    def _generate_table(self, c: canvas.Canvas, minimum_height = 0):
-        items_table_style = [
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('BACKGROUND', (0, 0), (-1, 0), colors.Color(0.7,0.7,0.7)),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black), 
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ]
-
-        col_percentage = [0.55, 0.10, 0.20, 0.15]
-        colWidth = [(format[0] - MARGIN_LEFT - MARGIN_RIGHT) * p for p in col_percentage]
-        headers = ["Article", "Quantité", "Prix unitaire (€ HT)", "Total (€ HT)"]
-        page_items = [[headers]]
-        height_sum = 0
-        for item in self.items[1:]:
-            title_desc = Paragraph(f"<b>{item[0]}</b><br/>{item[1]}")
-            height_sum += title_desc.wrap(colWidth[0],2147483647)[1]
-
-            if (height_sum > 410 and len(page_items) == 1) or (len(page_items) > 1 and height_sum > 550):
-                page_items.append([headers])
-                height_sum = 0
-            page_items[-1].append([title_desc, f"{item[2]}", f"{item[3]:.2f}", f"{item[2]*item[3]:.2f}"])
-
-        add_last_page = 0
-        if (height_sum > 440 - minimum_height and len(page_items) == 1) or (len(page_items) > 1 and height_sum > 640 - minimum_height):
-            add_last_page = 1
-
-        for i, page_item in enumerate(page_items):
+    def _generate_table(self, c: canvas.Canvas, template, stats, minimum_height = 0):
+        from reportlab.platypus import Table
+
+        colWidth = template.items_col_widths
+        headers = template.items_headers
+        locale = template.locale
+
+        # Measure every row once. The measured paragraphs are reused when the tables are drawn
+        title_desc_width = template.title_desc_width
+        rows = []
+        row_heights = []
+        for (title, description, quantity, price), line_total in zip(self.items.columns(), self.totals().line_totals):
+            title_desc, title_desc_height = wrap_paragraph(f"<b>{title}</b><br/>{description}", title_desc_width)
+            row_heights.append(row_height(title_desc_height))
+            rows.append([title_desc, locale.quantity(quantity), locale.price(price), locale.amount(line_total)])
+        header_height = template.items_header_height
+
+        page_space = format[1] - MARGIN_TOP - MARGIN_BOTTOM
+        first_page_space = c._currentMatrix[5] - MARGIN_BOTTOM
+        pages, add_last_page = paginate(row_heights, header_height, first_page_space, page_space, minimum_height)
+        total_pages = len(pages) + add_last_page
+        stats.count("item_rows", len(rows))
+        stats.count("pages", total_pages)
+
+        for i, (start, end) in enumerate(pages):
             if i > 0:
                 c.showPage()
-                self._generate_header(c, i+1, len(page_items) + add_last_page)
-                self._generate_footer(c)
                 c.resetTransforms()
                 c.translate(MARGIN_LEFT,format[1] - MARGIN_TOP)
-            table = Table(page_item, colWidth)
-            table.setStyle(TableStyle(items_table_style))
+            c.saveState()
+            self._generate_header(c, template, i+1, total_pages)
+            template.draw_footer(c)
+            c.restoreState()
+
+            table = Table([headers] + rows[start:end], colWidth, rowHeights=[header_height] + row_heights[start:end])
+            table.setStyle(template.items_table_style)
             table.wrapOn(c, 0, 0)
             table.drawOn(c, 0, -table._height)
 
-            if (i == 0):
-                self._generate_header(c, i+1, len(page_items) + add_last_page)
-                self._generate_footer(c)
-
         if (add_last_page):
             c.showPage()
-            self._generate_header(c, len(page_items) + 1, len(page_items) + add_last_page)
-            self._generate_footer(c)
+            self._generate_header(c, template, total_pages, total_pages)
+            template.draw_footer(c)
             c.resetTransforms()
             c.translate(MARGIN_LEFT, format[1] - MARGIN_TOP)
         else :
             c.translate(0, - table._height)
 
-    def generate_pdf(self, name : str):
+    def generate_pdf(self, name : str, template = None, stats = None):
         """
         Generates a PDF file with the invoice details.
         name : The name of the PDF file without the ".pdf" extension.
+        template : An optional InvoiceTemplate compiled for the seller of this invoice.
+                   By default, the template is compiled once per seller and reused.
+                   Raises ValueError if the template does not match the seller, language or currency of the invoice.
+        stats : An optional RenderStats recording the timings and counters of the rendering.
         """
+        stats = stats or NO_STATS
         c = canvas.Canvas(f"{name}.pdf", pagesize=A4)
-        c.setTitle(f"Facture_{self.invoice_number}")
+        self._draw(c, template, stats)
+        start = stats.begin()
+        c.save()
+        stats.end("save", start)
+        if stats is not NO_STATS:
+            stats.count("bytes", os.path.getsize(f"{name}.pdf"))
+
+    def write_pdf(self, fp, template = None, stats = None):
+        """
+        Writes the PDF invoice to `fp`, a binary file object opened for writing (file, BytesIO, socket file...).
+        """
+        stats = stats or NO_STATS
+        c = canvas.Canvas(fp, pagesize=A4)
+        self._draw(c, template, stats)
+        start = stats.begin()
+        position = _tell(fp)
+        c.save()
+        stats.end("save", start)
+        if position is not None:
+            stats.count("bytes", _tell(fp) - position)
+
+    def to_bytes(self, template = None, stats = None) -> bytes:
+        """
+        Returns the PDF invoice as bytes, without touching the filesystem.
+        """
+        buffer = io.BytesIO()
+        self.write_pdf(buffer, template, stats)
+        return buffer.getvalue()
+
+    def iter_pdf(self, chunk_size : int = 64 * 1024, template = None, stats = None):
+        """
+        Yields the PDF invoice in chunks of at most `chunk_size` bytes, e.g. to stream it in an HTTP response
+        or an object-store upload.
+        """
+        data = memoryview(self.to_bytes(template, stats))
+        for start in range(0, len(data), chunk_size):
+            yield bytes(data[start:start + chunk_size])
+
+    def _draw(self, c : canvas.Canvas, template = None, stats = NO_STATS):
+        # reportlab.platypus is slow to import: it is only loaded once an invoice is drawn (see preload)
+        from reportlab.platypus import Table, TableStyle
+
+        if template is None:
+            template = compile_template(self)
+        elif not template.matches(self):
+            raise ValueError("The template was compiled for another seller, language or currency than the invoice")
+        locale = template.locale
+        c.setTitle(locale["title"].format(number=self.invoice_number))
         c.setAuthor(self.company_name)
 
-        self._generate_details(c)
+        start = stats.begin()
+        self._generate_details(c, template, stats)
+        stats.end("details", start)
+
+        start = stats.begin()
 
         total_table_style = [
             ('FONTSIZE', (0, 0), (-1, -1), 12),
@@ -289,12 +378,15 @@ class Invoice:
         ]
         col_percentage = [0.6, 0.4]
         total_table_colWidth = [(format[0] - MARGIN_LEFT - MARGIN_RIGHT) * 0.3 * p for p in col_percentage]
-        total_table_data = [
-            ["Total HT (€)", f"{sum(item[2]*item[3] for item in self.items[1:]):.2f}"],
-            ["Taux de TVA", f"{self.VAT_rate:.2f}%"],
-            ["Remise (€)", f"{self.discount:.2f}"],
-            ["Total TTC (€)", f"{sum(item[2]*item[3] for item in self.items[1:]) * (1 + self.VAT_rate/100) - self.discount:.2f}"]
-        ]
+        totals = self.totals()
+        total_table_data = [[locale["subtotal"], locale.amount(totals.subtotal)]]
+        if self.items.has_VAT_rates():
+            for rate, amount in sorted(totals.VAT.items()):
+                total_table_data.append([locale.VAT_label(rate), locale.amount(amount)])
+        else:
+            total_table_data.append([locale["VAT_rate"], locale.rate(self.VAT_rate)])
+        total_table_data.append([locale["discount"], locale.amount(totals.discount)])
+        total_table_data.append([locale["total"], locale.amount(totals.total)])
 
         total_table = Table(total_table_data, total_table_colWidth)
         total_table.setStyle(TableStyle(total_table_style))
@@ -308,30 +400,39 @@ class Invoice:
             ('TOPPADDING', (0, 0), (-1, -1), 5),
             ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
         ]
-        payment_terms_items = [[Paragraph("<b>Remarques et conditions de paiement</b>")]]
-        payment_terms_items.append([Paragraph("<br/>".join(self.payment_terms))])
-
         payment_terms_table_colWidth = [(format[0] - MARGIN_LEFT - MARGIN_RIGHT) * 0.5 ]
+        payment_terms_width = cell_width(payment_terms_table_colWidth[0])
+        payment_terms_items = [[wrap_paragraph(f"<b>{locale['payment_terms']}</b>", payment_terms_width)[0]]]
+        payment_terms_items.append([wrap_paragraph("<br/>".join(self.payment_terms), payment_terms_width)[0]])
         payment_terms_table = Table(payment_terms_items, payment_terms_table_colWidth)
         payment_terms_table.setStyle(TableStyle(payment_terms_table_style))
         payment_terms_table.wrapOn(c, 0, 0)
         
         offset = max(payment_terms_table._height, total_table._height) + VERTICAL_SPACING
-        self._generate_table(c, minimum_height=offset)
+        stats.end("totals", start)
+
+        start = stats.begin()
+        self._generate_table(c, template, stats, minimum_height=offset)
+        stats.end("items", start)
 
         # Draw recap tables
+        start = stats.begin()
         payment_terms_table.drawOn(c, 0, -payment_terms_table._height)
         total_table.drawOn(c, format[0] - MARGIN_LEFT - MARGIN_RIGHT - total_table._width - 0.5 * HORIZONTAL_SPACING, - offset + VERTICAL_SPACING)
-
-        self._generate_footer(c)
-        c.save()
+        stats.end("totals", start)
 
 
     def generate_from_json(json_str : str):
         """
         Generates an Invoice object from a JSON string.
         """
-        data = rapidjson.loads(json_str)
+        return Invoice.generate_from_dict(rapidjson.loads(json_str))
+
+    def generate_from_dict(data : dict):
+        """
+        Generates an Invoice object from an already decoded JSON object.
+        Raises ValueError if a required field is missing.
+        """
         invoice = Invoice()
         try:
             invoice.company_name = data["company_name"]
@@ -364,7 +465,159 @@ class Invoice:
             invoice.VAT_rate = data["VAT_rate"]
             invoice.discount = data["discount"]
             invoice.payment_terms = data["payment_terms"]
-        except KeyError:
-            print("Error: JSON file does not contain all required fields.")
+            invoice.language = data.get("language", DEFAULT_LANGUAGE)
+            invoice.currency = data.get("currency", DEFAULT_CURRENCY)
+        except KeyError as e:
+            raise ValueError(f"JSON file does not contain the required field {e.args[0]!r}") from None
         return invoice
-    
\ No newline at end of file
+
+
+def _tell(fp):
+    try:
+        return fp.tell()
+    except (AttributeError, OSError):
+        return None
+
+
+SELLER_FIELDS = (
+    "company_name",
+    "company_logo",
+    "company_VAT_number",
+    "company_registration_number",
+    "company_email",
+    "company_address",
+    "company_zip_city",
+    "company_phone",
+    # The labels of the template depend on the locale of the invoice
+    "language",
+    "currency",
+)
+TEMPLATE_CACHE_SIZE = 16
+
+class InvoiceTemplate:
+    def __init__(self, invoice : Invoice):
+        """
+        Compiles the static parts of an invoice, which only depend on the seller and the locale: the seller block
+        with the logo, the footer legal line, the items table header and styles.
+        The seller block and the footer are drawn once per template into compiled PDF Form XObjects. They are
+        registered as is in each document and referenced on every page.
+
+        invoice : An invoice from the seller. Only the SELLER_FIELDS attributes are read.
+        """
+        from reportlab.platypus import TableStyle
+
+        for field in SELLER_FIELDS:
+            setattr(self, field, getattr(invoice, field))
+        self.key = _seller_key(invoice)
+        self._seller_form = None
+        self._footer_form = None
+        self.locale = get_locale(self.language, self.currency)
+        self.footer_text = self.locale["footer"].format(
+            company_name=self.company_name,
+            registration_number=self.company_registration_number,
+            VAT_number=self.company_VAT_number,
+        )
+
+        col_percentage = [0.55, 0.10, 0.20, 0.15]
+        self.items_col_widths = [(format[0] - MARGIN_LEFT - MARGIN_RIGHT) * p for p in col_percentage]
+        self.items_headers = self.locale.items_headers
+        self.items_header_height = row_height()
+        self.title_desc_width = cell_width(self.items_col_widths[0])
+        self.items_table_style = TableStyle([
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('BACKGROUND', (0, 0), (-1, 0), colors.Color(0.7,0.7,0.7)),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ])
+
+    def _draw_seller_form(self, c : canvas.Canvas, stats):
+        start = stats.begin()
+        logo = LOGO_CACHE.define(c, self.company_logo)
+        stats.end("logo", start)
+        c.translate(0, -LOGO_CACHE.draw(c, logo))
+
+        c.setFont("Helvetica-Bold", 18)
+        c.translate(0, - VERTICAL_SPACING)
+        c.drawString(0, 0, f"{self.company_name}")
+        c.setFont("Helvetica", 12)
+        for text in (self.company_address, self.company_zip_city, self.company_phone, self.company_email):
+            c.translate(0, - 12 - LINE_SPACE)
+            c.drawString(0, 0, f"{text}")
+
+    def _draw_footer_form(self, c : canvas.Canvas):
+        c.setFillColorRGB(0.5,0.5,0.5)
+        c.setFont("Helvetica",8)
+        c.drawCentredString(0.5 * format[0], 0.5 * MARGIN_BOTTOM, self.footer_text)
+
+    def draw_seller(self, c : canvas.Canvas, stats = NO_STATS):
+        """
+        Draws the logo and the seller details with their top left corner at the current origin of the canvas.
+        The seller block is drawn on the first call only, later invoices reuse the compiled form.
+        """
+        if self._seller_form is None:
+            self._seller_form = compile_form(
+                f"seller_{self.key[:16]}",
+                lambda form_canvas: self._draw_seller_form(form_canvas, stats),
+                (-format[0], -format[1], format[0], format[1]),
+            )
+        self._seller_form.draw(c)
+
+    def draw_footer(self, c : canvas.Canvas):
+        """
+        Draws the footer legal line of the current page.
+        """
+        if self._footer_form is None:
+            self._footer_form = compile_form(f"footer_{self.key[:16]}", self._draw_footer_form, (0, 0) + format)
+        c.saveState()
+        c.resetTransforms()
+        self._footer_form.draw(c)
+        c.restoreState()
+
+    def matches(self, invoice : Invoice):
+        """
+        Tells if the template was compiled for the seller of `invoice`.
+        """
+        return all(getattr(self, field) == getattr(invoice, field) for field in SELLER_FIELDS)
+
+
+_templates = OrderedDict()
+
+def _seller_key(invoice : Invoice):
+    seller = "\x1f".join(str(getattr(invoice, field)) for field in SELLER_FIELDS)
+    return hashlib.sha256(seller.encode("utf-8")).hexdigest()
+
+def compile_template(invoice : Invoice):
+    """
+    Returns the InvoiceTemplate for the seller of `invoice`, compiling it on first use.
+    The last TEMPLATE_CACHE_SIZE templates are kept.
+    """
+    key = _seller_key(invoice)
+    template = _templates.get(key)
+    if template is not None:
+        _templates.move_to_end(key)
+        return template
+    template = InvoiceTemplate(invoice)
+    _templates[key] = template
+    if len(_templates) > TEMPLATE_CACHE_SIZE:
+        _templates.popitem(last=False)
+    return template
+
+
+def preload(svg : bool = True):
+    """
+    Imports the dependencies that are otherwise only loaded when the first invoice is drawn, and loads the
+    font metrics. Call it in the parent process of a pre-fork server, or pass it as the initializer of a
+    process pool, so that the first invoice of each worker does not pay for it.
+    svg : Also import svglib and lxml, used by SVG logos.
+    Pillow is not deferred: reportlab.pdfgen.canvas already imports it.
+    """
+    modules = ["reportlab.platypus"]
+    if svg:
+        modules += ["lxml.etree", "svglib.svglib", "reportlab.graphics.renderPDF"]
+    for module in modules:
+        importlib.import_module(module)
+    load_numpy()
+    for font in ("Helvetica", "Helvetica-Bold"):
+        string_width("0", font, 10)
@@ -0,0 +1,137 @@
+import mmap
+import os
+
+import rapidjson
+
+from invoice_generator.generator import Invoice
+from invoice_generator.locales import CURRENCY_DECIMALS, LABELS
+
+
+_STRING = {"type": "string"}
+_NUMBER = {"type": "number"}
+# Numbers and identifiers may be given as JSON numbers, they are printed as they are
+_IDENTIFIER = {"type": ["string", "number"]}
+
+# JSON schema of an invoice, as read by Invoice.generate_from_dict
+INVOICE_SCHEMA = {
+    "type": "object",
+    "required": [
+        "company_name", "company_logo", "company_VAT_number", "company_registration_number",
+        "company_email", "company_address", "company_zip_city", "company_phone",
+        "customer_name", "invoice_number", "invoice_date", "due_date",
+        "items", "VAT_rate", "discount", "payment_terms",
+    ],
+    "properties": {
+        "company_name": _STRING,
+        "company_logo": _STRING,
+        "company_VAT_number": _IDENTIFIER,
+        "company_registration_number": _IDENTIFIER,
+        "company_email": _STRING,
+        "company_address": _STRING,
+        "company_zip_city": _STRING,
+        "company_phone": _IDENTIFIER,
+        "customer_number": _IDENTIFIER,
+        "customer_name": _STRING,
+        "invoice_number": _IDENTIFIER,
+        "invoice_date": _STRING,
+        "due_date": _STRING,
+        "invoicing_address": _STRING,
+        "invoicing_zip_city": _STRING,
+        "invoicing_phone": _IDENTIFIER,
+        "invoicing_email": _STRING,
+        "shipping_address": _STRING,
+        "shipping_zip_city": _STRING,
+        "shipping_phone": _IDENTIFIER,
+        "shipping_email": _STRING,
+        # The first row is the header, the following ones are [title, description, quantity, price, VAT rate (optional)]
+        "items": {
+            "type": "array",
+            "items": [{"type": "array"}],
+            "additionalItems": {
+                "type": "array",
+                "minItems": 4,
+                "items": [_STRING, _STRING, _NUMBER, _NUMBER, _NUMBER],
+            },
+        },
+        "VAT_rate": _NUMBER,
+        "discount": _NUMBER,
+        "payment_terms": {"type": "array", "items": _STRING},
+        "language": {"enum": list(LABELS)},
+        # An ISO 4217 code, of a currency with cents
+        "currency": {"type": "string", "pattern": "^[A-Z]{3}$", "not": {"enum": sorted(CURRENCY_DECIMALS)}},
+    },
+}
+
+# Compiled once, shared by every record
+_validator = rapidjson.Validator(rapidjson.dumps(INVOICE_SCHEMA))
+
+class Record:
+    __slots__ = ("line_number", "invoice", "error")
+
+    def __init__(self, line_number : int, invoice : Invoice = None, error : str = None):
+        """
+        One record of a JSON Lines file.
+
+        Attributes:
+        - line_number: The line number of the record in the file, starting at 1.
+        - invoice: The Invoice object, or None if the record is invalid.
+        - error: The reason why the record is invalid, or None.
+        """
+        self.line_number = line_number
+        self.invoice = invoice
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def _describe(error : rapidjson.ValidationError, line : bytes):
+    kind, schema_path, document_path = error.args
+    if kind == "required":
+        data = rapidjson.loads(line)
+        missing = [field for field in INVOICE_SCHEMA["required"] if field not in data]
+        return f"missing required fields: {', '.join(missing)}"
+    return f"invalid value at {document_path} ({kind} constraint {schema_path})"
+
+def parse_record(line : bytes, line_number : int = 0):
+    """
+    Validates and decodes one JSON invoice. Returns a Record, errors are reported in `Record.error`.
+    """
+    try:
+        _validator(line)
+        return Record(line_number, Invoice.generate_from_dict(rapidjson.loads(line)))
+    except rapidjson.ValidationError as e:
+        return Record(line_number, error=_describe(e, line))
+    except (rapidjson.JSONDecodeError, ValueError) as e:
+        return Record(line_number, error=f"invalid JSON: {e}")
+
+def _lines(f, use_mmap : bool):
+    if use_mmap and os.fstat(f.fileno()).st_size > 0:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield from iter(mm.readline, b"")
+    else:
+        yield from f
+
+def iter_jsonl(path : str, use_mmap : bool = False):
+    """
+    Lazily reads a JSON Lines file of invoices, one invoice per line, and yields a Record per non-empty line.
+    Only the current line is held in memory, whatever the size of the file.
+
+    use_mmap : Read the file through a memory map instead of buffered reads.
+    """
+    with open(path, "rb") as f:
+        for line_number, line in enumerate(_lines(f, use_mmap), 1):
+            if line.strip():
+                yield parse_record(line, line_number)
+
+def iter_invoices(records, on_error = None):
+    """
+    Yields the Invoice objects of valid records, e.g. to feed render_batch.
+    on_error : Called with each invalid Record. By default, invalid records are skipped.
+    """
+    for record in records:
+        if record.error is None:
+            yield record.invoice
+        elif on_error is not None:
+            on_error(record)
@@ -0,0 +1,54 @@
+from time import perf_counter
+
+
+class RenderStats:
+    def __init__(self):
+        """
+        Records the timings and counters of the rendering of an invoice. Pass it as `stats` to
+        Invoice.generate_pdf (or write_pdf, to_bytes, iter_pdf) and read it once the invoice is rendered.
+        A RenderStats can be reused for several invoices: timings and counters add up.
+
+        Attributes:
+        - timings: A dictionary mapping each phase to the time spent in it, in seconds.
+                   Phases are "details" (of which "logo"), "items", "totals" and "save".
+        - counters: A dictionary of counters: "item_rows", "pages" and "bytes" written.
+        """
+        self.timings = {}
+        self.counters = {}
+
+    def begin(self):
+        """
+        Returns the start time of a phase, to be passed to `end`.
+        """
+        return perf_counter()
+
+    def end(self, phase : str, start : float):
+        self.timings[phase] = self.timings.get(phase, 0.0) + perf_counter() - start
+
+    def count(self, counter : str, value : int = 1):
+        self.counters[counter] = self.counters.get(counter, 0) + value
+
+    def as_dict(self):
+        """
+        Returns the timings and counters as a flat dictionary, e.g. to export them to a metrics system.
+        """
+        data = {f"{phase}_seconds": duration for phase, duration in self.timings.items()}
+        data.update(self.counters)
+        return data
+
+
+class _NoStats:
+    # Used when instrumentation is disabled: every call is a no-op
+    __slots__ = ()
+
+    def begin(self):
+        return 0.0
+
+    def end(self, phase : str, start : float):
+        pass
+
+    def count(self, counter : str, value : int = 1):
+        pass
+
+
+NO_STATS = _NoStats()
@@ -0,0 +1,181 @@
+from functools import lru_cache
+
+from invoice_generator.measure import string_width
+from invoice_generator.models import format_quantity
+from invoice_generator.totals import format_amount, format_price
+
+
+DEFAULT_LANGUAGE = "fr"
+DEFAULT_CURRENCY = "EUR"
+
+# Symbols of the currencies. Other currencies are printed with their ISO 4217 code
+CURRENCY_SYMBOLS = {
+    "EUR": "€",
+    "USD": "$",
+    "GBP": "£",
+    "CHF": "CHF",
+}
+
+# Number of decimals of the ISO 4217 currencies whose minor unit is not a hundredth. Amounts are computed
+# in cents (see totals), so these currencies are rejected instead of being printed with wrong decimals
+CURRENCY_DECIMALS = {
+    **dict.fromkeys(("BIF", "CLP", "DJF", "GNF", "ISK", "JPY", "KMF", "KRW", "PYG", "RWF", "UGX", "UYI", "VND",
+                     "VUV", "XAF", "XOF", "XPF"), 0),
+    **dict.fromkeys(("BHD", "IQD", "JOD", "KWD", "LYD", "OMR", "TND"), 3),
+    **dict.fromkeys(("CLF", "UYW"), 4),
+}
+
+# Labels of each language. "{currency}" is replaced by the currency symbol when the locale is compiled
+LABELS = {
+    "fr": {
+        "title": "Facture_{number}",
+        "invoice": "Facture n°",
+        "customer_number": "Numéro de client: ",
+        "date": "Date: ",
+        "due_date": "Echéance: ",
+        "customer": "Client: ",
+        "invoicing_address": ("Adresse de", "facturation"),
+        "shipping_address": ("Adresse de", "livraison"),
+        "page": "Page {page}/{pages}",
+        "footer": " {company_name} RCS {registration_number} - Numéro de TVA intracommunautaire {VAT_number}",
+        "items_headers": ("Article", "Quantité", "Prix unitaire ({currency} HT)", "Total ({currency} HT)"),
+        "subtotal": "Total HT ({currency})",
+        "VAT_rate": "Taux de TVA",
+        "VAT": "TVA {rate}% ({currency})",
+        "discount": "Remise ({currency})",
+        "total": "Total TTC ({currency})",
+        "payment_terms": "Remarques et conditions de paiement",
+        "decimal_separator": ",",
+        "thousands_separator": "\xa0",
+    },
+    "en": {
+        "title": "Invoice_{number}",
+        "invoice": "Invoice No. ",
+        "customer_number": "Customer number: ",
+        "date": "Date: ",
+        "due_date": "Due date: ",
+        "customer": "Customer: ",
+        "invoicing_address": ("Billing", "address"),
+        "shipping_address": ("Shipping", "address"),
+        "page": "Page {page}/{pages}",
+        "footer": " {company_name} Company No. {registration_number} - VAT No. {VAT_number}",
+        "items_headers": ("Item", "Quantity", "Unit price ({currency} net)", "Total ({currency} net)"),
+        "subtotal": "Subtotal ({currency})",
+        "VAT_rate": "VAT rate",
+        "VAT": "VAT {rate}% ({currency})",
+        "discount": "Discount ({currency})",
+        "total": "Total ({currency})",
+        "payment_terms": "Notes and payment terms",
+        "decimal_separator": ".",
+        "thousands_separator": ",",
+    },
+    "de": {
+        "title": "Rechnung_{number}",
+        "invoice": "Rechnung Nr. ",
+        "customer_number": "Kundennummer: ",
+        "date": "Datum: ",
+        "due_date": "Fällig am: ",
+        "customer": "Kunde: ",
+        "invoicing_address": ("Rechnungs-", "adresse"),
+        "shipping_address": ("Liefer-", "adresse"),
+        "page": "Seite {page}/{pages}",
+        "footer": " {company_name} Handelsregister {registration_number} - USt-IdNr. {VAT_number}",
+        "items_headers": ("Artikel", "Menge", "Preis ({currency} netto)", "Gesamt ({currency})"),
+        "subtotal": "Netto ({currency})",
+        "VAT_rate": "USt.-Satz",
+        "VAT": "USt. {rate}% ({currency})",
+        "discount": "Rabatt ({currency})",
+        "total": "Brutto ({currency})",
+        "payment_terms": "Hinweise und Zahlungsbedingungen",
+        "decimal_separator": ",",
+        "thousands_separator": ".",
+    },
+}
+
+class Locale:
+    def __init__(self, language : str, currency : str):
+        """
+        The labels and number formatting of a language and currency, compiled once by get_locale and
+        shared by every invoice rendered with them. The currency is substituted in the labels, and the
+        widths of the labels used for the layout are measured upfront.
+        Numbers are printed with the decimal and thousands separators of the language. Raises ValueError
+        for a currency that is not an ISO 4217 code, or whose minor unit is not a hundredth (CURRENCY_DECIMALS).
+
+        Attributes:
+        - language: The language code, a key of LABELS.
+        - currency: The ISO 4217 code of the currency.
+        - symbol: The symbol printed for the currency.
+        - labels: The labels of the language, with the currency substituted.
+        - items_headers: The headers of the items table.
+        - widths: The widths of the labels of the invoice details, by label name.
+        - address_width: The width of the titles of the address blocks.
+        """
+        if language not in LABELS:
+            raise ValueError(f"Unsupported language {language!r}, expected one of {', '.join(LABELS)}")
+        if not (len(currency) == 3 and currency.isascii() and currency.isalpha() and currency.isupper()):
+            raise ValueError(f"Invalid currency {currency!r}, expected an ISO 4217 code such as EUR")
+        if currency in CURRENCY_DECIMALS:
+            raise ValueError(f"Unsupported currency {currency}: amounts are printed with 2 decimals, "
+                             f"{currency} has {CURRENCY_DECIMALS[currency]}")
+        self.language = language
+        self.currency = currency
+        self.symbol = CURRENCY_SYMBOLS.get(currency, currency)
+        self.labels = {
+            name: label.replace("{currency}", self.symbol) if isinstance(label, str) else label
+            for name, label in LABELS[language].items()
+        }
+        self.items_headers = [header.replace("{currency}", self.symbol) for header in self.labels["items_headers"]]
+        self._separator = self.labels["decimal_separator"]
+        self._grouping = self.labels["thousands_separator"]
+        self._VAT_labels = {}
+
+        self.widths = {"invoice": string_width(self.labels["invoice"], "Helvetica-Bold", 16)}
+        for name in ("customer_number", "date", "due_date", "customer"):
+            self.widths[name] = string_width(self.labels[name], "Helvetica", 12)
+        self.address_width = max(
+            string_width(line, "Helvetica-Bold", 12)
+            for name in ("invoicing_address", "shipping_address")
+            for line in self.labels[name]
+        )
+
+    def __getitem__(self, name : str):
+        return self.labels[name]
+
+    def _decimal(self, text : str):
+        # Localizes a number formatted as "-1234.5": 1234.5 -> "1 234,5" in French
+        integer, point, decimals = text.partition(".")
+        digits = integer.lstrip("-")
+        if len(digits) > 3:
+            head = len(digits) % 3 or 3
+            groups = [digits[:head]] + [digits[i:i + 3] for i in range(head, len(digits), 3)]
+            integer = integer[:len(integer) - len(digits)] + self._grouping.join(groups)
+        return f"{integer}{self._separator}{decimals}" if point else integer
+
+    def amount(self, cents : int):
+        return self._decimal(format_amount(cents))
+
+    def price(self, price : float):
+        return self._decimal(format_price(price))
+
+    def quantity(self, quantity : float):
+        return self._decimal(format_quantity(quantity))
+
+    def rate(self, rate : float):
+        return self._decimal(f"{rate:.2f}%")
+
+    def VAT_label(self, rate : float):
+        """
+        Returns the label of the VAT at `rate` in the totals table. Labels are formatted once per rate.
+        """
+        label = self._VAT_labels.get(rate)
+        if label is None:
+            label = self._VAT_labels[rate] = self.labels["VAT"].format(rate=self._decimal(f"{rate:g}"))
+        return label
+
+
+@lru_cache(maxsize=None)
+def get_locale(language : str = DEFAULT_LANGUAGE, currency : str = DEFAULT_CURRENCY):
+    """
+    Returns the Locale of `language` and `currency`, compiled on first use and shared afterwards.
+    """
+    return Locale(language, currency)
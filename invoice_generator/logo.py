@@ -0,0 +1,179 @@
+import base64
+import binascii
+import hashlib
+import io
+from collections import OrderedDict
+
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+from reportlab.pdfbase import pdfdoc
+
+from invoice_generator.forms import CompiledForm, compile_form, register_image
+
+
+MAX_DRAWING_SIZE = 150
+DEFAULT_CACHE_SIZE = 32
+# Resolution at which raster logos are embedded. Larger images are downsampled to their printed size at this resolution
+RASTER_DPI = 300
+# Bounding box of the form of an SVG logo, large enough not to clip drawings with an offset origin
+SVG_FORM_BBOX = (-A4[0], -A4[1], A4[0], A4[1])
+
+class Logo:
+    __slots__ = ("key", "form", "image", "width", "height")
+
+    def __init__(self, key : str, form : CompiledForm = None, image = None, width : float = 0, height : float = 0):
+        """
+        A logo ready to be drawn, as stored in the LogoCache.
+
+        Attributes:
+        - key: The hash of the logo content.
+        - form: The compiled PDF form of an SVG logo, or None.
+        - image: The compressed PDF image of a raster logo, or None.
+        - width: The printed width of a raster logo.
+        - height: The vertical space taken by the logo.
+        """
+        self.key = key
+        self.form = form
+        self.image = image
+        self.width = width
+        self.height = height
+
+
+def _raster_data(logo):
+    """
+    Returns the image file content of a raster logo (bytes, data URI or base64 string), or None for an SVG logo.
+    """
+    if isinstance(logo, (bytes, bytearray)):
+        return bytes(logo)
+    logo = logo.strip()
+    if logo.startswith("<"):
+        return None
+    if logo.startswith("data:"):
+        logo = logo.partition(",")[2]
+    try:
+        return base64.b64decode(logo, validate=True)
+    except binascii.Error:
+        raise ValueError("company_logo must be an SVG document, or a PNG or JPEG image (bytes, base64 or data URI)")
+
+
+class LogoCache:
+    def __init__(self, max_size : int = DEFAULT_CACHE_SIZE):
+        """
+        Size-bounded LRU cache of rendered logos, keyed by the hash of the logo content.
+
+        An SVG logo is parsed, scaled to MAX_DRAWING_SIZE, rendered to a PDF Form XObject and compressed
+        once per process. A PNG or JPEG logo is decoded, downsampled to its printed size at RASTER_DPI and
+        compressed once per process. Either is then registered as is in each document it is drawn in,
+        once per document, and every later use is a reference to it.
+
+        Attributes:
+        - max_size: The maximum number of logos kept in the cache.
+        - hits: The number of lookups served from the cache.
+        - misses: The number of lookups that required parsing and rendering the logo.
+        """
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._logos = OrderedDict()
+
+    def _render_svg(self, key : str, logo : str):
+        # svglib and lxml are only imported by processes that render SVG logos
+        from svglib.svglib import SvgRenderer
+        from lxml import etree
+        from reportlab.graphics import renderPDF
+
+        svg_root = etree.fromstring(logo)
+        svgRenderer = SvgRenderer('')
+        drawing = svgRenderer.render(svg_root)
+
+        max_dimension = max(drawing.width, drawing.height)
+        scale = MAX_DRAWING_SIZE/max_dimension
+        if max_dimension > MAX_DRAWING_SIZE:
+            drawing.scale(scale, scale)
+        # The drawing tree is walked once here, and only the compressed operator stream is kept
+        form = compile_form(f"logo_{key[:16]}", lambda c: renderPDF.draw(drawing, c, 0, 0), SVG_FORM_BBOX)
+        return Logo(key, form=form, height=drawing.height * scale)
+
+    def _render_raster(self, key : str, data : bytes):
+        from reportlab.lib.utils import ImageReader
+        from PIL import Image
+
+        image = Image.open(io.BytesIO(data))
+        # Pixels are taken as points, as SVG units are
+        width, height = image.size
+        scale = min(1, MAX_DRAWING_SIZE/max(width, height))
+        width, height = width * scale, height * scale
+
+        has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+        max_pixels = (round(width * RASTER_DPI / 72), round(height * RASTER_DPI / 72))
+        if image.size[0] > max_pixels[0] or image.size[1] > max_pixels[1]:
+            image.thumbnail(max_pixels, Image.LANCZOS)
+
+        # Compressed once here, shared by every canvas the logo is drawn on
+        pdf_image = pdfdoc.PDFImageXObject(f"logo_{key[:16]}", ImageReader(image), mask="auto" if has_alpha else None)
+        return Logo(key, image=pdf_image, width=width, height=height)
+
+    def get(self, logo):
+        """
+        Returns the Logo for `logo`, an SVG document or a raster image, rendering it on a cache miss.
+        """
+        content = logo if isinstance(logo, (bytes, bytearray)) else logo.encode("utf-8")
+        key = hashlib.sha256(content).hexdigest()
+        entry = self._logos.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._logos.move_to_end(key)
+            return entry
+
+        self.misses += 1
+        data = _raster_data(logo)
+        entry = self._render_svg(key, logo) if data is None else self._render_raster(key, data)
+        self._logos[key] = entry
+        if len(self._logos) > self.max_size:
+            self._logos.popitem(last=False)
+        return entry
+
+    def define(self, c : canvas.Canvas, logo):
+        """
+        Registers the logo as an XObject in the document of the canvas, unless it already exists.
+        Returns the Logo.
+        """
+        entry = self.get(logo)
+        if entry.image is not None:
+            register_image(c, entry.image)
+        else:
+            entry.form.define(c)
+        return entry
+
+    def draw(self, c : canvas.Canvas, entry : Logo):
+        """
+        Draws a Logo returned by define on the same canvas, with its top left corner at the current origin.
+        The logo is not looked up again, so that a draw counts as a single hit or miss.
+        Returns the vertical space taken by the logo.
+        """
+        c.saveState()
+        c.translate(0, -entry.height)
+        if entry.image is not None:
+            c.scale(entry.width, entry.height)
+            c._code.append(f"/{c._doc.getXObjectName(entry.image.name)} Do")
+            c._formsinuse.append(entry.image.name)
+        else:
+            c.doForm(entry.form.name)
+        c.restoreState()
+        return entry.height
+
+    def stats(self):
+        """
+        Returns the cache counters as a dictionary.
+        """
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._logos)}
+
+    def clear(self):
+        self._logos.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+# Shared by all the invoices rendered in the process
+LOGO_CACHE = LogoCache()
@@ -0,0 +1,144 @@
+import tempfile
+
+from reportlab.pdfgen import canvas
+from reportlab.pdfbase import pdfdoc
+
+from invoice_generator.generator import Invoice, A4
+from invoice_generator.instrumentation import NO_STATS
+
+
+class _Spool:
+    def __init__(self, fp, spool_dir : str = None):
+        # Compressed page streams, written as pages are finished and read back once by save()
+        self.file = tempfile.TemporaryFile(dir=spool_dir)
+        self.fp = fp
+        self._output = None
+
+    def write(self, data : bytes):
+        offset = self.file.seek(0, 2)
+        self.file.write(data)
+        return offset
+
+    def read(self, offset : int, length : int):
+        self.file.seek(offset)
+        return self.file.read(length)
+
+    def write_through(self, document : pdfdoc.PDFDocument):
+        # While the document is being formatted, send every formatted object straight to the output file
+        # instead of joining the whole document in memory
+        output = document.__accum__
+        if output is self._output:
+            return
+        for data in output.strings:
+            self.fp.write(data)
+        output.strings.clear()
+        output.write = self.fp.write
+        self._output = output
+
+    def close(self):
+        self.file.close()
+
+
+class _SpooledStream(pdfdoc.PDFObject):
+    __Comment__ = "page stream"
+
+    def __init__(self, spool : _Spool, offset : int, length : int):
+        self.spool = spool
+        self.offset = offset
+        self.length = length
+
+    def format(self, document):
+        self.spool.write_through(document)
+        stream = pdfdoc.PDFStream(content=self.spool.read(self.offset, self.length))
+        stream.dictionary["Filter"] = pdfdoc.PDFArray([pdfdoc.PDFName(pdfdoc.PDFZCompress.pdfname)])
+        return stream.format(document)
+
+
+class MailingDocument:
+    def __init__(self, output, title : str = None, spool_dir : str = None):
+        """
+        Renders many invoices into a single .pdf document, e.g. for a print and mail run.
+        Each invoice starts on a new page and keeps its own page numbering ("Page 1/2").
+        The seller blocks, footers, logos and fonts are emitted once in the document and shared by every invoice.
+
+        Pages are compressed and spooled to a temporary file as soon as they are finished, and written straight
+        to `output` by save(), so that the content of the pages is not kept in memory. The page objects themselves
+        stay in memory until save(): memory still grows by a few KiB per page, much more slowly than with a plain canvas.
+
+        output : The name of the .pdf file, or a binary file object opened for writing.
+        title : The title of the document. Defaults to the title of the last invoice.
+        spool_dir : The directory of the temporary spool file. Defaults to the system temporary directory.
+
+        Attributes:
+        - page_ranges: The list of (invoice_number, first_page, page_count) tuples of the invoices added, in order.
+        """
+        if hasattr(output, "write"):
+            self._fp, self._owns_fp = output, False
+        else:
+            self._fp, self._owns_fp = open(output, "wb"), True
+        self.title = title
+        self.page_ranges = []
+        self._spool = _Spool(self._fp, spool_dir)
+        self._canvas = canvas.Canvas(self._fp, pagesize=A4)
+        self._canvas.setPageCallBack(self._spool_page)
+
+    @property
+    def page_count(self):
+        return sum(pages for _, _, pages in self.page_ranges)
+
+    def _spool_page(self, page_number : int):
+        page = self._canvas._doc.Pages[-1]
+        data = pdfdoc.PDFZCompress.encode(page.stream)
+        page.Contents = _SpooledStream(self._spool, self._spool.write(data), len(data))
+        page.stream = None
+
+    def add(self, invoice : Invoice, template = None, stats = None):
+        """
+        Renders `invoice` at the end of the document and returns its (invoice_number, first_page, page_count).
+        template : An optional InvoiceTemplate, as for Invoice.generate_pdf.
+        stats : An optional RenderStats recording the timings and counters of the rendering.
+        """
+        c = self._canvas
+        if self.page_ranges:
+            c.showPage()
+        first_page = self.page_count + 1
+        invoice._draw(c, template, stats or NO_STATS)
+        page_range = (invoice.invoice_number, first_page, c.getPageNumber() - first_page + 1)
+        self.page_ranges.append(page_range)
+        return page_range
+
+    def save(self):
+        """
+        Writes the document and closes the output file if it was opened from a name.
+        """
+        try:
+            if self.title is not None:
+                self._canvas.setTitle(self.title)
+            self._canvas.save()
+        finally:
+            self.close()
+
+    def close(self):
+        self._spool.close()
+        if self._owns_fp:
+            self._fp.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.save()
+        else:
+            self.close()
+
+
+def render_mailing(invoices, output, title : str = None, spool_dir : str = None):
+    """
+    Renders an iterable of Invoice objects into a single .pdf document, consuming it lazily.
+    Returns the list of (invoice_number, first_page, page_count) tuples of the invoices.
+    """
+    with MailingDocument(output, title, spool_dir) as document:
+        for invoice in invoices:
+            document.add(invoice)
+    return document.page_ranges
@@ -0,0 +1,58 @@
+import copy
+from functools import lru_cache
+
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.lib.styles import ParagraphStyle
+
+
+STRING_WIDTH_CACHE_SIZE = 8192
+PARAGRAPH_CACHE_SIZE = 4096
+MAX_HEIGHT = 2147483647
+
+@lru_cache(maxsize=STRING_WIDTH_CACHE_SIZE)
+def string_width(text : str, font : str, size : float):
+    """
+    Memoized width of `text` drawn with `font` at `size`, same as canvas.stringWidth.
+    """
+    return stringWidth(text, font, size)
+
+@lru_cache(maxsize=PARAGRAPH_CACHE_SIZE)
+def _measure_paragraph(text : str, width : float, font : str, size : float):
+    # reportlab.platypus is only imported once an invoice is drawn
+    from invoice_generator.paragraph import MeasuredParagraph
+    style = ParagraphStyle("measured", fontName=font, fontSize=size, leading=1.2*size)
+    paragraph = MeasuredParagraph(text, style)
+    return paragraph, paragraph.wrap(width, MAX_HEIGHT)[1]
+
+def wrap_paragraph(text : str, width : float, font : str = "Helvetica", size : float = 10):
+    """
+    Memoized paragraph wrapping. Returns a (paragraph, height) tuple where paragraph is
+    a MeasuredParagraph already wrapped to `width`.
+    The line breaks are computed once and shared. Each call returns a new paragraph: drawing sets
+    attributes on it, so a shared one could not be drawn from several threads at once.
+    """
+    paragraph, height = _measure_paragraph(text, width, font, size)
+    return copy.copy(paragraph), height
+
+def _cache_stats(function):
+    info = function.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "hit_rate": info.hits / lookups if lookups else 0.0,
+    }
+
+def measure_stats():
+    """
+    Returns the counters of the measurement caches as a dictionary.
+    """
+    return {
+        "string_width": _cache_stats(string_width),
+        "paragraph": _cache_stats(_measure_paragraph),
+    }
+
+def clear_measure_cache():
+    string_width.cache_clear()
+    _measure_paragraph.cache_clear()
@@ -0,0 +1,190 @@
+import math
+from array import array
+from operator import mul
+
+
+# Header row emitted when items are converted back to the list of lists format
+ITEMS_HEADER = ["Article", "Quantité", "Prix unitaire (HT)"]
+
+class LineItem:
+    __slots__ = ("title", "description", "quantity", "price", "VAT_rate")
+
+    def __init__(self, title : str, description : str, quantity : float, price : float, VAT_rate : float = None):
+        """
+        One line of the shopping cart.
+        VAT_rate : The VAT rate of this line. None means the VAT rate of the invoice.
+        For compatibility with the list format, fields can also be read by index: item[2] is the quantity.
+        """
+        self.title = title
+        self.description = description
+        self.quantity = quantity
+        self.price = price
+        self.VAT_rate = VAT_rate
+
+    def _fields(self):
+        if self.VAT_rate is None:
+            return (self.title, self.description, self.quantity, self.price)
+        return (self.title, self.description, self.quantity, self.price, self.VAT_rate)
+
+    def __getitem__(self, index):
+        return self._fields()[index]
+
+    def __iter__(self):
+        return iter(self._fields())
+
+    def __len__(self):
+        return 4 if self.VAT_rate is None else 5
+
+    def __repr__(self):
+        return f"LineItem({self.title!r}, {self.description!r}, {self.quantity!r}, {self.price!r}, {self.VAT_rate!r})"
+
+
+class ItemList:
+    __slots__ = ("titles", "descriptions", "quantities", "prices", "VAT_rates")
+
+    def __init__(self):
+        """
+        Columnar store of the line items of an invoice. Quantities and prices are kept
+        in arrays of doubles, so that totals are computed without going through Python objects.
+
+        For compatibility with the list of lists format, an ItemList reads like the rows it was built from:
+        items[0] is the header row (ITEMS_HEADER), items[1:] are the LineItem rows and len() counts the header.
+        Use the columns, columns() or item_count() to work on the items only.
+
+        Attributes:
+        - titles: The list of item titles.
+        - descriptions: The list of item descriptions.
+        - quantities: The array of item quantities.
+        - prices: The array of item unit prices.
+        - VAT_rates: The array of item VAT rates, NaN for the items using the VAT rate of the invoice.
+        """
+        self.titles = []
+        self.descriptions = []
+        self.quantities = array("d")
+        self.prices = array("d")
+        self.VAT_rates = array("d")
+
+    def from_rows(rows, header : bool = True):
+        """
+        Builds an ItemList from the list of lists format: [title, description, quantity, price] rows,
+        with an optional fifth VAT rate column.
+        header : The first row is a header and is skipped, as in Invoice.items.
+        """
+        items = ItemList()
+        items.extend(rows[1:] if header else rows)
+        return items
+
+    def to_rows(self):
+        """
+        Returns the items in the list of lists format, with a header row.
+        """
+        rows = [list(ITEMS_HEADER)]
+        for title, description, quantity, price, VAT_rate in zip(self.titles, self.descriptions, self.quantities, self.prices, self.VAT_rates):
+            row = [title, description, _number(quantity), _number(price)]
+            if not math.isnan(VAT_rate):
+                row.append(_number(VAT_rate))
+            rows.append(row)
+        return rows
+
+    def append(self, item):
+        """
+        Appends a LineItem or a [title, description, quantity, price] row, with an optional VAT rate.
+        """
+        VAT_rate = item[4] if len(item) > 4 else None
+        # Converted before anything is appended, so that an invalid row leaves the columns unchanged
+        quantity, price, VAT_rate = array("d", (item[2], item[3], math.nan if VAT_rate is None else VAT_rate))
+        title, description = item[0], item[1]
+        self.titles.append(title)
+        self.descriptions.append(description)
+        self.quantities.append(quantity)
+        self.prices.append(price)
+        self.VAT_rates.append(VAT_rate)
+
+    def extend(self, items):
+        """
+        Appends LineItem objects or rows without header, or the items of another ItemList.
+        """
+        if isinstance(items, ItemList):
+            self.titles.extend(items.titles)
+            self.descriptions.extend(items.descriptions)
+            self.quantities.extend(items.quantities)
+            self.prices.extend(items.prices)
+            self.VAT_rates.extend(items.VAT_rates)
+            return
+        for item in items:
+            self.append(item)
+
+    def __iadd__(self, items):
+        self.extend(items)
+        return self
+
+    def columns(self):
+        """
+        Iterates over (title, description, quantity, price) tuples without building LineItem objects.
+        """
+        return zip(self.titles, self.descriptions, self.quantities, self.prices)
+
+    def subtotal(self):
+        """
+        Returns the sum of quantity * price over all items.
+        """
+        return math.fsum(map(mul, self.quantities, self.prices))
+
+    def has_VAT_rates(self):
+        """
+        Tells if some items have their own VAT rate.
+        """
+        return any(not math.isnan(VAT_rate) for VAT_rate in self.VAT_rates)
+
+    def item_count(self):
+        """
+        Returns the number of items, without the header row.
+        """
+        return len(self.titles)
+
+    def _item(self, index : int):
+        VAT_rate = self.VAT_rates[index]
+        return LineItem(self.titles[index], self.descriptions[index], self.quantities[index], self.prices[index],
+                        None if math.isnan(VAT_rate) else VAT_rate)
+
+    def __len__(self):
+        return len(self.titles) + 1
+
+    def __iter__(self):
+        yield list(ITEMS_HEADER)
+        for index in range(len(self.titles)):
+            yield self._item(index)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ItemList index out of range")
+        return list(ITEMS_HEADER) if index == 0 else self._item(index - 1)
+
+    def __eq__(self, other):
+        if not isinstance(other, ItemList):
+            return NotImplemented
+        return (self.titles == other.titles and self.descriptions == other.descriptions
+                and self.quantities == other.quantities and self.prices == other.prices
+                and self.VAT_rates.tobytes() == other.VAT_rates.tobytes())
+
+
+def as_item_list(items):
+    """
+    Returns `items` as an ItemList. Lists of lists are expected to start with a header row.
+    """
+    if isinstance(items, ItemList):
+        return items
+    return ItemList.from_rows(items)
+
+def _number(value : float):
+    return int(value) if value.is_integer() else value
+
+def format_quantity(quantity : float):
+    """
+    Formats a quantity without a trailing ".0" for whole numbers.
+    """
+    return f"{_number(quantity)}"
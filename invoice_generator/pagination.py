@@ -0,0 +1,44 @@
+# Default cell geometry of reportlab tables (reportlab.platypus.tables.CellStyle)
+CELL_LEADING = 12
+CELL_TOP_PADDING = 3
+CELL_BOTTOM_PADDING = 3
+CELL_HORIZONTAL_PADDING = 6 + 6
+
+def cell_width(col_width : float):
+    """
+    Returns the width available to the content of a table cell.
+    """
+    return col_width - CELL_HORIZONTAL_PADDING
+
+def row_height(content_height : float = CELL_LEADING):
+    """
+    Returns the height of a table row from the height of its tallest cell content.
+    One line of text is CELL_LEADING high.
+    """
+    return max(content_height, CELL_LEADING) + CELL_TOP_PADDING + CELL_BOTTOM_PADDING
+
+def paginate(row_heights, header_height : float, first_page_space : float, page_space : float, reserve : float = 0):
+    """
+    Splits rows into pages given their measured heights.
+
+    row_heights : The height of each row.
+    header_height : The height of the header row repeated on top of every page.
+    first_page_space : The vertical space available for the table on the first page.
+    page_space : The vertical space available for the table on the following pages.
+    reserve : The space that must remain under the table on the last page.
+
+    Returns a tuple (pages, extra_page) where pages is a list of (start, end) row slices, and extra_page
+    tells if `reserve` does not fit under the last slice and needs a page of its own.
+    A row taller than a whole page is kept on its own page.
+    """
+    pages = []
+    start = 0
+    space = first_page_space - header_height
+    for i, height in enumerate(row_heights):
+        if height > space and i > start:
+            pages.append((start, i))
+            start = i
+            space = page_space - header_height
+        space -= height
+    pages.append((start, len(row_heights)))
+    return pages, space < reserve
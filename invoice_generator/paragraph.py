@@ -0,0 +1,16 @@
+from reportlab.platypus import Paragraph
+
+
+class MeasuredParagraph(Paragraph):
+    """
+    Paragraph that remembers its last wrap. Tables wrap their cells again when they are drawn:
+    with the same width, the measurement done for pagination is reused instead of breaking the lines again.
+    """
+    _measured_width = None
+    _measured_size = None
+
+    def wrap(self, availWidth, availHeight):
+        if availWidth != self._measured_width:
+            self._measured_size = Paragraph.wrap(self, availWidth, availHeight)
+            self._measured_width = availWidth
+        return self._measured_size
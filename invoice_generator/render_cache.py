@@ -0,0 +1,139 @@
+import hashlib
+import os
+import tempfile
+
+import rapidjson
+import reportlab
+
+from invoice_generator.generator import Invoice, LAYOUT_VERSION
+
+
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+
+def invoice_key(invoice : Invoice):
+    """
+    Returns the content hash of an invoice: the hash of its canonical JSON form (the fields read by
+    generate_from_dict, with sorted keys), of LAYOUT_VERSION and of the reportlab version.
+    """
+    data = rapidjson.dumps(invoice.to_dict(), sort_keys=True)
+    content = f"{LAYOUT_VERSION}\x1f{reportlab.Version}\x1f{data}"
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class RenderCache:
+    def __init__(self, directory : str, max_bytes : int = DEFAULT_MAX_BYTES):
+        """
+        Opt-in on-disk cache of rendered invoices, keyed by the content hash of the invoice (see invoice_key).
+        Rendering an invoice whose data did not change since it was cached returns the stored PDF instead.
+
+        Files are written atomically, so that a cache directory can be shared by the processes of a batch.
+        When the cache grows over `max_bytes`, the least recently used files are evicted.
+
+        Attributes:
+        - directory: The cache directory.
+        - max_bytes: The maximum total size of the cached files.
+        - hits: The number of invoices served from the cache.
+        - misses: The number of invoices rendered and stored.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+        # Estimated size of the directory, recomputed on eviction as other processes may write to it
+        self._size = sum(size for _, _, size in self._entries())
+
+    def _path(self, key : str):
+        return os.path.join(self.directory, key[:2], f"{key}.pdf")
+
+    def _entries(self):
+        for sub_directory in os.scandir(self.directory):
+            if sub_directory.is_dir():
+                for entry in os.scandir(sub_directory.path):
+                    if entry.name.endswith(".pdf"):
+                        stat = entry.stat()
+                        yield stat.st_mtime, entry.path, stat.st_size
+
+    def get(self, invoice : Invoice):
+        """
+        Returns the cached PDF of `invoice` as bytes, or None.
+        """
+        return self._read(self._path(invoice_key(invoice)))
+
+    def put(self, invoice : Invoice, data : bytes):
+        self._write(self._path(invoice_key(invoice)), data)
+
+    def _read(self, path : str):
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            # The modification time orders the files for eviction
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return data
+
+    def _write(self, path : str, data : bytes):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        self._size += len(data)
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        """
+        Removes the least recently used files until the cache is under 90% of `max_bytes`.
+        """
+        entries = sorted(self._entries())
+        self._size = sum(size for _, _, size in entries)
+        target = 0.9 * self.max_bytes
+        for _, path, size in entries:
+            if self._size <= target:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            self._size -= size
+
+    def to_bytes(self, invoice : Invoice, template = None, stats = None) -> bytes:
+        """
+        Returns the PDF of `invoice` as bytes, from the cache or rendered and stored on a miss.
+        """
+        path = self._path(invoice_key(invoice))
+        data = self._read(path)
+        if data is not None:
+            self.hits += 1
+            return data
+        self.misses += 1
+        data = invoice.to_bytes(template, stats)
+        self._write(path, data)
+        return data
+
+    def generate_pdf(self, invoice : Invoice, name : str, template = None, stats = None):
+        """
+        Same as Invoice.generate_pdf, the PDF is served from the cache when the invoice did not change.
+        """
+        data = self.to_bytes(invoice, template, stats)
+        with open(f"{name}.pdf", "wb") as f:
+            f.write(data)
+
+    def stats(self):
+        """
+        Returns the cache counters as a dictionary.
+        """
+        return {"hits": self.hits, "misses": self.misses, "size": self._size}
+
+    def clear(self):
+        for _, path, _ in list(self._entries()):
+            os.unlink(path)
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
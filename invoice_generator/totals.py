@@ -0,0 +1,156 @@
+import importlib.util
+import math
+
+from invoice_generator.models import ItemList
+
+
+# Amounts are computed in integer cents, quantities in thousandths, unit prices in ten-thousandths
+# (sub-cent prices, e.g. per kWh) and VAT rates in hundredths of percent.
+# Every rounding is half away from zero, as done for accounting amounts
+CENTS = 100
+QUANTITY_SCALE = 1000
+PRICE_SCALE = 10000
+RATE_SCALE = 100 * 100
+# Divisor from quantity * price to cents
+LINE_SCALE = QUANTITY_SCALE * PRICE_SCALE // CENTS
+
+# NumPy is imported on first use, for carts large enough to benefit from vectorized operations
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+NUMPY_MIN_ITEMS = 256
+np = None
+# NumPy computes with 64-bit integers, larger carts fall back to Python integers
+INT64_MAX = 2 ** 63 - 1
+
+class Totals:
+    __slots__ = ("line_totals", "subtotal", "VAT", "VAT_total", "discount", "total")
+
+    def __init__(self, line_totals, subtotal : int, VAT : dict, discount : int):
+        """
+        Totals of an invoice. All amounts are integer numbers of cents.
+
+        Attributes:
+        - line_totals: The total of each line (quantity * unit price), in the order of the items.
+        - subtotal: The total before VAT (Total HT).
+        - VAT: A dictionary mapping each VAT rate to the VAT amount of the lines at that rate.
+        - VAT_total: The total VAT amount.
+        - discount: The discount.
+        - total: The total with VAT, minus the discount (Total TTC).
+        """
+        self.line_totals = line_totals
+        self.subtotal = subtotal
+        self.VAT = VAT
+        self.VAT_total = sum(VAT.values())
+        self.discount = discount
+        self.total = subtotal + self.VAT_total - discount
+
+
+def _divide(value : int, divisor : int):
+    # Integer division rounding half away from zero
+    quotient = (2 * abs(value) + divisor) // (2 * divisor)
+    return quotient if value >= 0 else -quotient
+
+# Added before truncating to absorb the binary representation error of decimal inputs (1.005 * 100 == 100.49999999999999)
+HALF = 0.5 + 1e-7
+
+def _scale(value : float, scale : int):
+    # Fixed-point value of `value`, rounded half away from zero
+    return int(value * scale + HALF) if value >= 0 else -int(-value * scale + HALF)
+
+def _to_cents(amount : float):
+    return _scale(amount, CENTS)
+
+def _compute_python(items : ItemList, VAT_rate : float):
+    products = [
+        (int(quantity * QUANTITY_SCALE + HALF) if quantity >= 0 else -int(-quantity * QUANTITY_SCALE + HALF))
+        * (int(price * PRICE_SCALE + HALF) if price >= 0 else -int(-price * PRICE_SCALE + HALF))
+        for quantity, price in zip(items.quantities, items.prices)
+    ]
+    line_totals = [
+        (2 * product + LINE_SCALE) // (2 * LINE_SCALE) if product >= 0 else _divide(product, LINE_SCALE)
+        for product in products
+    ]
+    bases = {}
+    for line_total, rate in zip(line_totals, items.VAT_rates):
+        rate = float(VAT_rate) if math.isnan(rate) else rate
+        bases[rate] = bases.get(rate, 0) + line_total
+    return line_totals, sum(line_totals), bases
+
+def _scale_array(values, scale : int):
+    # Same rounding as _scale
+    scaled = (np.abs(values) * scale + HALF).astype(np.int64)
+    return np.where(values >= 0, scaled, -scaled)
+
+def load_numpy():
+    """
+    Imports NumPy if it is installed. Returns the module, or None.
+    """
+    global np
+    if np is None and HAS_NUMPY:
+        import numpy
+        np = numpy
+    return np
+
+def _fits_int64(quantities, prices):
+    # Bounds the intermediate values of _compute_numpy with Python integers
+    max_quantity, max_price = float(np.abs(quantities).max()), float(np.abs(prices).max())
+    if not (math.isfinite(max_quantity) and math.isfinite(max_price)):
+        return False
+    product = _scale(max_quantity, QUANTITY_SCALE) * _scale(max_price, PRICE_SCALE)
+    return 2 * product + LINE_SCALE <= INT64_MAX and len(quantities) * (product // LINE_SCALE + 1) <= INT64_MAX
+
+def _compute_numpy(items : ItemList, VAT_rate : float):
+    """
+    Returns None when the amounts could overflow 64-bit integers.
+    """
+    # The arrays share the memory of the ItemList columns
+    quantities = np.frombuffer(items.quantities, dtype=np.float64)
+    prices = np.frombuffer(items.prices, dtype=np.float64)
+    if not _fits_int64(quantities, prices):
+        return None
+    products = _scale_array(quantities, QUANTITY_SCALE) * _scale_array(prices, PRICE_SCALE)
+    line_totals = (2 * np.abs(products) + LINE_SCALE) // (2 * LINE_SCALE) * np.sign(products)
+
+    rates = np.frombuffer(items.VAT_rates, dtype=np.float64)
+    rates = np.where(np.isnan(rates), VAT_rate, rates)
+    bases = {}
+    for rate in np.unique(rates):
+        bases[float(rate)] = int(line_totals[rates == rate].sum())
+    return line_totals, int(line_totals.sum()), bases
+
+def compute_totals(items : ItemList, VAT_rate : float, discount : float):
+    """
+    Computes the line totals, the subtotal, the VAT per rate and the total of an invoice in one pass.
+    Quantities, unit prices (to 1/10000, for sub-cent prices) and the discount are converted to fixed point,
+    then every amount is computed with integer arithmetic. Line totals are rounded to the cent, half away from zero.
+    The VAT of each rate is computed on the sum of the lines at that rate.
+    Uses NumPy for carts of NUMPY_MIN_ITEMS items or more when it is installed, unless the amounts could overflow
+    64-bit integers. The pure Python fallback gives the same amounts, but is slower than floating point sums on large carts.
+    """
+    result = None
+    if items.item_count() >= NUMPY_MIN_ITEMS and load_numpy() is not None:
+        result = _compute_numpy(items, VAT_rate)
+    if result is None:
+        result = _compute_python(items, VAT_rate)
+    line_totals, subtotal, bases = result
+    if not bases:
+        bases = {float(VAT_rate): 0}
+    VAT = {rate: _divide(base * _scale(rate, CENTS), RATE_SCALE) for rate, base in bases.items()}
+    return Totals(line_totals, subtotal, VAT, _to_cents(discount))
+
+def format_amount(cents : int):
+    """
+    Formats an amount in cents with two decimals: 12345 -> "123.45".
+    """
+    sign = "-" if cents < 0 else ""
+    cents = abs(int(cents))
+    return f"{sign}{cents // CENTS}.{cents % CENTS:02d}"
+
+def format_price(price : float):
+    """
+    Formats a unit price with two to four decimals, as used by the totals: 9.9 -> "9.90", 0.1534 -> "0.1534".
+    """
+    scaled = _scale(price, PRICE_SCALE)
+    sign = "-" if scaled < 0 else ""
+    scaled = abs(scaled)
+    decimals = f"{scaled % PRICE_SCALE:04d}".rstrip("0").ljust(2, "0")
+    return f"{sign}{scaled // PRICE_SCALE}.{decimals}"
@@ -0,0 +1,33 @@
+import os
+
+import pytest
+import rapidjson
+
+from benchmarks.common import make_invoice
+from invoice_generator.batch import render_batch
+
+
+def test_invalid_payloads_are_reported(tmp_path):
+    valid = make_invoice(3, number=1).to_dict()
+    missing = make_invoice(3, number=2).to_dict()
+    del missing["items"], missing["VAT_rate"]
+    result = render_batch([valid, missing, rapidjson.dumps(missing), "{not json"], str(tmp_path), workers=1)
+    assert len(result.rendered) == 1
+    assert [index for index, _ in result.errors] == [1, 2, 3]
+    assert "missing required fields: items, VAT_rate" in result.errors[0][1]
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_duplicate_invoice_numbers_are_reported(tmp_path, workers):
+    first, second = make_invoice(2, number=1), make_invoice(5, number=1)
+    result = render_batch([first, second.to_dict(), make_invoice(2, number=2)], str(tmp_path), workers=workers)
+    assert sorted(os.listdir(tmp_path)) == ["2021-000001.pdf", "2021-000002.pdf"]
+    assert len(result.rendered) == 2
+    assert [index for index, _ in result.errors] == [1]
+    assert "already the output of invoice #0" in result.errors[0][1]
+
+def test_dot_only_invoice_numbers(tmp_path):
+    invoices = [make_invoice(2, number=number) for number in range(3)]
+    invoices[0].invoice_number, invoices[1].invoice_number, invoices[2].invoice_number = "..", ".", " "
+    result = render_batch(invoices, str(tmp_path), workers=1)
+    assert not result.errors
+    assert sorted(os.listdir(tmp_path)) == ["invoice_0.pdf", "invoice_1.pdf", "invoice_2.pdf"]
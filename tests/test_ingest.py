@@ -0,0 +1,42 @@
+import pytest
+import rapidjson
+
+from benchmarks.common import make_invoice
+from invoice_generator.generator import Invoice
+from invoice_generator.ingest import iter_invoices, iter_jsonl, parse_record
+
+
+def _line(**changes):
+    data = make_invoice(3).to_dict()
+    data.update(changes)
+    return rapidjson.dumps(data).encode("utf-8")
+
+def test_numeric_identifiers_are_accepted():
+    record = parse_record(_line(invoice_number=1024, customer_number=7, company_phone=600000000))
+    assert record.ok, record.error
+    assert record.invoice.invoice_number == 1024
+    assert record.invoice.to_bytes().startswith(b"%PDF")
+
+def test_invalid_records():
+    data = make_invoice(3).to_dict()
+    del data["due_date"]
+    assert parse_record(rapidjson.dumps(data)).error == "missing required fields: due_date"
+    assert "VAT_rate" in parse_record(_line(VAT_rate="20")).error
+    assert parse_record(b"{not json").error.startswith("invalid JSON")
+
+def test_iter_jsonl(tmp_path):
+    path = tmp_path / "invoices.jsonl"
+    path.write_bytes(_line() + b"\n\n" + _line(items="none") + b"\n" + _line(invoice_number="2") + b"\n")
+    for use_mmap in (False, True):
+        records = list(iter_jsonl(str(path), use_mmap=use_mmap))
+        assert [record.line_number for record in records] == [1, 3, 4]
+        assert [record.ok for record in records] == [True, False, True]
+        errors = []
+        assert [invoice.invoice_number for invoice in iter_invoices(records, errors.append)] == ["2021-000001", "2"]
+        assert [record.line_number for record in errors] == [3]
+
+def test_generate_from_dict_names_the_missing_field():
+    data = make_invoice(3).to_dict()
+    del data["payment_terms"]
+    with pytest.raises(ValueError, match="payment_terms"):
+        Invoice.generate_from_dict(data)
@@ -0,0 +1,45 @@
+import pytest
+import rapidjson
+
+from benchmarks.common import make_invoice
+from invoice_generator.ingest import parse_record
+from invoice_generator.locales import Locale, get_locale
+
+
+@pytest.mark.parametrize("language, amount, price, quantity", [
+    ("fr", "116\xa0893,00", "1\xa0234,5678", "12\xa0500"),
+    ("en", "116,893.00", "1,234.5678", "12,500"),
+    ("de", "116.893,00", "1.234,5678", "12.500"),
+])
+def test_number_formatting(language, amount, price, quantity):
+    locale = get_locale(language, "EUR")
+    assert locale.amount(11689300) == amount
+    assert locale.price(1234.5678) == price
+    assert locale.quantity(12500.0) == quantity
+
+def test_small_and_negative_numbers():
+    locale = get_locale("fr", "EUR")
+    assert locale.amount(12345) == "123,45"
+    assert locale.amount(-123456789) == "-1\xa0234\xa0567,89"
+    assert locale.amount(-5) == "-0,05"
+    assert locale.quantity(2.5) == "2,5"
+
+def test_labels():
+    locale = get_locale("en", "USD")
+    assert locale.symbol == "$"
+    assert locale["subtotal"] == "Subtotal ($)"
+    assert locale.VAT_label(5.5) == "VAT 5.5% ($)"
+    assert get_locale("de", "SEK")["total"] == "Brutto (SEK)"
+    assert get_locale("en", "USD") is locale
+
+@pytest.mark.parametrize("currency", ["JPY", "KWD", "eur", "EURO", ""])
+def test_unsupported_currencies(currency):
+    with pytest.raises(ValueError):
+        Locale("fr", currency)
+    data = make_invoice(2).to_dict()
+    data["currency"] = currency
+    assert not parse_record(rapidjson.dumps(data)).ok
+
+def test_unsupported_language():
+    with pytest.raises(ValueError):
+        Locale("es", "EUR")
@@ -0,0 +1,22 @@
+from benchmarks.common import make_invoice, make_svg_logo
+from invoice_generator.generator import InvoiceTemplate
+from invoice_generator.logo import LOGO_CACHE
+
+
+def test_one_lookup_per_seller_block():
+    LOGO_CACHE.clear()
+    for number in range(3):
+        invoice = make_invoice(5, number=number)
+        invoice.to_bytes(InvoiceTemplate(invoice))
+    assert LOGO_CACHE.stats() == {"hits": 2, "misses": 1, "size": 1}
+
+def test_svg_logo_is_rendered_once(monkeypatch):
+    from reportlab.graphics import renderPDF
+
+    calls = []
+    draw = renderPDF.draw
+    monkeypatch.setattr(renderPDF, "draw", lambda *args, **kwargs: calls.append(1) or draw(*args, **kwargs))
+    logo = make_svg_logo(50)
+    documents = [make_invoice(5, logo=logo, number=number).to_bytes() for number in range(3)]
+    assert len(calls) == 1
+    assert all(document.startswith(b"%PDF") for document in documents)
@@ -0,0 +1,65 @@
+import io
+import re
+import zlib
+
+from benchmarks.common import make_invoice
+from invoice_generator.mailing import MailingDocument, render_mailing
+
+
+def _read_pages(data : bytes):
+    """
+    Checks the cross-reference table of a PDF and returns the decompressed content stream of each page, in order.
+    """
+    xref = int(re.search(rb"startxref\s+(\d+)\s+%%EOF\s*$", data).group(1))
+    assert data[xref:].startswith(b"xref")
+    first, count = map(int, re.match(rb"xref\s+(\d+) (\d+)\s+", data[xref:]).groups())
+    table = data[xref:].split(b"\n", 2)[2]
+    offsets = {}
+    for number in range(first, first + count):
+        offset, _, kind = table[20 * (number - first):20 * (number - first) + 18].split(b" ")
+        if kind == b"n":
+            offsets[number] = int(offset)
+            # Every offset must point at the start of its object
+            assert data[int(offset):].startswith(b"%d 0 obj" % number), number
+
+    def read(number):
+        start = offsets[number]
+        return data[start:data.index(b"endobj", start)]
+
+    def stream(number):
+        obj = read(number)
+        length = int(re.search(rb"/Length (\d+)", obj).group(1))
+        start = re.search(rb"stream\r?\n", obj).end()
+        content = obj[start:start + length]
+        return zlib.decompress(content) if b"/FlateDecode" in obj else content
+
+    trailer = data[data.rindex(b"trailer"):]
+    root = int(re.search(rb"/Root (\d+) 0 R", trailer).group(1))
+    pages = read(int(re.search(rb"/Pages (\d+) 0 R", read(root)).group(1)))
+    kids = [int(kid) for kid in re.findall(rb"(\d+) 0 R", re.search(rb"/Kids \[([^\]]*)\]", pages).group(1))]
+    assert int(re.search(rb"/Count (\d+)", pages).group(1)) == len(kids)
+    return [stream(int(re.search(rb"/Contents (\d+) 0 R", read(kid)).group(1))) for kid in kids]
+
+
+def test_mailing_pages_and_labels():
+    invoices = [make_invoice(5, number=1), make_invoice(150, number=2), make_invoice(60, number=3), make_invoice(1, number=4)]
+    output = io.BytesIO()
+    page_ranges = render_mailing(invoices, output)
+    pages = _read_pages(output.getvalue())
+
+    assert [number for number, _, _ in page_ranges] == [invoice.invoice_number for invoice in invoices]
+    assert len(pages) == sum(page_count for _, _, page_count in page_ranges)
+    assert page_ranges[1][2] > 1
+    for number, first_page, page_count in page_ranges:
+        for page in range(page_count):
+            content = pages[first_page - 1 + page]
+            assert f"(Page {page + 1}/{page_count}) Tj".encode() in content
+            assert f"(Facture n\\260{number}) Tj".encode() in content or page > 0
+
+def test_mailing_document_to_file(tmp_path):
+    path = tmp_path / "mailing.pdf"
+    with MailingDocument(str(path), title="Mailing") as document:
+        for number in range(3):
+            document.add(make_invoice(20, number=number))
+    pages = _read_pages(path.read_bytes())
+    assert len(pages) == document.page_count >= 3
@@ -0,0 +1,42 @@
+import pytest
+
+from invoice_generator.models import ITEMS_HEADER, ItemList, LineItem
+
+
+ROWS = [
+    ["title", "description", "quantity", "price"],
+    ["Pen", "Blue", 2, 1.5],
+    ["Paper", "A4", 1, 4.99, 5.5],
+]
+
+def test_reads_like_the_assigned_rows():
+    items = ItemList.from_rows(ROWS)
+    assert len(items) == len(ROWS)
+    assert items.item_count() == 2
+    assert items[0] == ITEMS_HEADER
+    assert list(items[1]) == ROWS[1]
+    assert isinstance(items[-1], LineItem)
+    assert list(items[-1]) == ROWS[2]
+    assert [list(item) for item in items[1:]] == ROWS[1:]
+    assert [list(row) for row in items] == [ITEMS_HEADER] + ROWS[1:]
+    with pytest.raises(IndexError):
+        items[3]
+
+def test_rows_round_trip():
+    items = ItemList.from_rows(ROWS)
+    assert ItemList.from_rows(items) == items
+    assert ItemList.from_rows(items.to_rows()) == items
+
+def test_invalid_row_leaves_columns_unchanged():
+    items = ItemList.from_rows(ROWS)
+    for row in (["Ink", "Black", "one", 3.0], ["Ink", "Black", 1], ["Ink", "Black", 1, 3.0, "20%"]):
+        with pytest.raises((TypeError, IndexError)):
+            items.append(row)
+        assert items == ItemList.from_rows(ROWS)
+        assert len(items.titles) == len(items.quantities) == len(items.prices) == len(items.VAT_rates) == 2
+
+def test_extend_with_item_list():
+    items = ItemList.from_rows(ROWS)
+    items.extend(ItemList.from_rows(ROWS))
+    assert items.item_count() == 4
+    assert list(items[3]) == list(items[1])
@@ -0,0 +1,59 @@
+import random
+
+from benchmarks.common import LOREM, make_invoice
+from invoice_generator import generator
+from invoice_generator.pagination import paginate
+
+
+def test_rows_fit_their_page():
+    rng = random.Random(0)
+    heights = [rng.uniform(18, 120) for _ in range(500)]
+    pages, _ = paginate(heights, 20, 300, 700)
+    assert pages[0][0] == 0 and pages[-1][1] == len(heights)
+    for i, (start, end) in enumerate(pages):
+        assert start < end
+        assert i == 0 or start == pages[i - 1][1]
+        assert 20 + sum(heights[start:end]) <= (300 if i == 0 else 700)
+        # A page only ends when the next row does not fit
+        if end < len(heights):
+            assert 20 + sum(heights[start:end + 1]) > (300 if i == 0 else 700)
+
+def test_row_taller_than_a_page():
+    assert paginate([10, 1000, 10], 5, 100, 100) == ([(0, 1), (1, 2), (2, 3)], False)
+    assert paginate([1000], 5, 100, 100) == ([(0, 1)], True)
+
+def test_reserve_forces_an_extra_page():
+    heights = [10] * 9
+    assert paginate(heights, 10, 100, 100) == ([(0, 9)], False)
+    assert paginate(heights, 10, 100, 100, reserve=1) == ([(0, 9)], True)
+    assert paginate(heights[:5], 10, 100, 100, reserve=40) == ([(0, 5)], False)
+
+def test_empty_cart():
+    assert paginate([], 10, 100, 100) == ([(0, 0)], False)
+    assert paginate([], 10, 100, 100, reserve=50) == ([(0, 0)], False)
+    assert paginate([], 10, 100, 100, reserve=95) == ([(0, 0)], True)
+
+
+def test_no_row_crosses_the_bottom_margin(monkeypatch):
+    from reportlab.platypus import Table
+
+    bottoms = []
+    draw_on = Table.drawOn
+    def record(table, c, x, y, *args, **kwargs):
+        bottoms.append(c._currentMatrix[5] + y)
+        return draw_on(table, c, x, y, *args, **kwargs)
+    monkeypatch.setattr(Table, "drawOn", record)
+
+    invoice = make_invoice(0)
+    words = LOREM.split()
+    invoice.items = [["Article", "Quantité", "Prix unitaire (HT)"]] + [
+        [f"item{i}", " ".join(words[:(i * 7) % len(words)]), 1, 1.5] for i in range(3000)
+    ]
+    assert invoice.to_bytes().startswith(b"%PDF")
+    assert len(bottoms) > 50
+    assert min(bottoms) >= generator.MARGIN_BOTTOM - 1e-6
+
+def test_empty_cart_renders():
+    invoice = make_invoice(0)
+    assert invoice.items.item_count() == 0
+    assert invoice.to_bytes().startswith(b"%PDF")
@@ -0,0 +1,53 @@
+import base64
+import io
+import re
+
+import pytest
+from PIL import Image
+
+from benchmarks.common import make_invoice
+from invoice_generator.logo import LOGO_CACHE, MAX_DRAWING_SIZE, RASTER_DPI
+
+
+def _image(size, mode="RGBA", format="PNG"):
+    buffer = io.BytesIO()
+    Image.new(mode, size, (0, 0, 255, 128) if mode == "RGBA" else (0, 0, 255)).save(buffer, format)
+    return buffer.getvalue()
+
+@pytest.mark.parametrize("encode", [
+    lambda data: data,
+    lambda data: base64.b64encode(data).decode(),
+    lambda data: "data:image/png;base64," + base64.b64encode(data).decode(),
+])
+def test_png_logo_with_transparency(encode):
+    data = _image((300, 100))
+    documents = [make_invoice(3, logo=encode(data), number=number).to_bytes() for number in range(2)]
+    for document in documents:
+        # One image and its soft mask (alpha channel) per document
+        assert len(re.findall(rb"/Subtype /Image", document)) == 2
+        assert b"/SMask" in document
+    entry = LOGO_CACHE.get(encode(data))
+    assert (entry.width, entry.height) == (MAX_DRAWING_SIZE, MAX_DRAWING_SIZE / 3)
+
+def test_jpeg_logo():
+    document = make_invoice(3, logo=base64.b64encode(_image((80, 40), "RGB", "JPEG")).decode()).to_bytes()
+    assert len(re.findall(rb"/Subtype /Image", document)) == 1
+    assert b"/SMask" not in document
+
+def test_large_image_is_downsampled():
+    entry = LOGO_CACHE.get(_image((4000, 2000), "RGB"))
+    max_width = round(MAX_DRAWING_SIZE * RASTER_DPI / 72)
+    assert entry.image.width <= max_width
+    assert (entry.width, entry.height) == (MAX_DRAWING_SIZE, MAX_DRAWING_SIZE / 2)
+
+def test_image_is_decoded_once():
+    data = _image((64, 64))
+    LOGO_CACHE.get(data)
+    misses = LOGO_CACHE.misses
+    for number in range(3):
+        make_invoice(3, logo=data, number=number).to_bytes()
+    assert LOGO_CACHE.misses == misses
+
+def test_invalid_logo():
+    with pytest.raises(ValueError):
+        LOGO_CACHE.get("not an image")
@@ -0,0 +1,46 @@
+import os
+
+from benchmarks.common import make_invoice
+from invoice_generator import render_cache
+from invoice_generator.batch import render_batch
+from invoice_generator.render_cache import RenderCache, invoice_key
+
+
+def test_hit_after_miss(tmp_path):
+    cache = RenderCache(str(tmp_path))
+    invoice = make_invoice(3)
+    data = cache.to_bytes(invoice)
+    assert data.startswith(b"%PDF")
+    assert cache.to_bytes(make_invoice(3)) == data
+    assert cache.stats() == {"hits": 1, "misses": 1, "size": len(data)}
+
+def test_key_changes_with_the_invoice_and_the_layout(monkeypatch):
+    invoice = make_invoice(3)
+    key = invoice_key(invoice)
+    assert invoice_key(make_invoice(3)) == key
+    changed = make_invoice(3)
+    changed.items = changed.items.to_rows() + [["extra", "", 1, 1.0]]
+    assert invoice_key(changed) != key
+    monkeypatch.setattr(render_cache, "LAYOUT_VERSION", render_cache.LAYOUT_VERSION + 1)
+    assert invoice_key(invoice) != key
+
+def test_least_recently_used_files_are_evicted(tmp_path):
+    invoices = [make_invoice(3, number=number) for number in range(4)]
+    size = len(invoices[0].to_bytes())
+    cache = RenderCache(str(tmp_path), max_bytes=int(3.5 * size))
+    for number, invoice in enumerate(invoices[:3]):
+        cache.to_bytes(invoice)
+        # Modification times order the files for eviction
+        os.utime(cache._path(invoice_key(invoice)), (number, number))
+    cache.get(invoices[0])
+    cache.to_bytes(invoices[3])
+    assert cache.get(invoices[1]) is None
+    assert all(cache.get(invoice) is not None for invoice in (invoices[0], invoices[2], invoices[3]))
+    assert not [name for _, _, files in os.walk(tmp_path) for name in files if name.endswith(".tmp")]
+
+def test_render_batch_with_cache(tmp_path):
+    invoices = [make_invoice(3, number=number) for number in range(3)]
+    first = render_batch(invoices, str(tmp_path / "out"), workers=1, cache_dir=str(tmp_path / "cache"))
+    second = render_batch(invoices, str(tmp_path / "out"), workers=1, cache_dir=str(tmp_path / "cache"))
+    assert (first.cached, second.cached) == (0, 3)
+    assert not second.errors
@@ -0,0 +1,34 @@
+import pytest
+
+from benchmarks.common import make_invoice
+from invoice_generator.generator import InvoiceTemplate
+
+
+def test_shared_template():
+    template = InvoiceTemplate(make_invoice(5, number=0))
+    assert make_invoice(5, number=1).to_bytes(template).startswith(b"%PDF")
+
+def test_template_of_another_seller_is_rejected():
+    template = InvoiceTemplate(make_invoice(5))
+    invoice = make_invoice(5)
+    invoice.company_name = "Another company"
+    assert not template.matches(invoice)
+    with pytest.raises(ValueError):
+        invoice.to_bytes(template)
+
+def test_template_of_another_locale_is_rejected():
+    template = InvoiceTemplate(make_invoice(5))
+    invoice = make_invoice(5)
+    invoice.language = "en"
+    with pytest.raises(ValueError):
+        invoice.to_bytes(template)
+
+def test_shared_template_draws_the_static_parts_once(monkeypatch):
+    template = InvoiceTemplate(make_invoice(5))
+    calls = []
+    for method in ("_draw_seller_form", "_draw_footer_form"):
+        draw = getattr(template, method)
+        monkeypatch.setattr(template, method, lambda *args, draw=draw, method=method: calls.append(method) or draw(*args))
+    for number in range(3):
+        assert make_invoice(200, number=number).to_bytes(template).startswith(b"%PDF")
+    assert sorted(calls) == ["_draw_footer_form", "_draw_seller_form"]
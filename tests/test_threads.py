@@ -0,0 +1,10 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import make_invoice
+
+
+def test_render_from_several_threads():
+    invoices = [make_invoice(20, number=i) for i in range(32)]
+    with ThreadPoolExecutor(8) as executor:
+        documents = list(executor.map(lambda invoice: invoice.to_bytes(), invoices))
+    assert all(document.startswith(b"%PDF") for document in documents)
@@ -0,0 +1,70 @@
+import pytest
+
+from invoice_generator import totals
+from invoice_generator.models import ItemList
+from invoice_generator.totals import compute_totals, format_amount, format_price
+
+
+def _items(*rows):
+    return ItemList.from_rows([["title", "description", "quantity", "price"]] + [["item", "", *row] for row in rows])
+
+@pytest.fixture(params=["python", "numpy"])
+def engine(request, monkeypatch):
+    if request.param == "numpy":
+        if totals.load_numpy() is None:
+            pytest.skip("NumPy is not installed")
+        monkeypatch.setattr(totals, "NUMPY_MIN_ITEMS", 1)
+    else:
+        monkeypatch.setattr(totals, "HAS_NUMPY", False)
+        monkeypatch.setattr(totals, "np", None)
+    return request.param
+
+
+def test_sub_cent_price_is_not_rounded_before_multiplying(engine):
+    result = compute_totals(_items([1234, 0.1534]), 0, 0)
+    assert list(result.line_totals) == [18930]
+    assert result.subtotal == 18930
+
+def test_line_total_rounds_half_away_from_zero(engine):
+    assert list(compute_totals(_items([1, 0.125]), 0, 0).line_totals) == [13]
+    assert list(compute_totals(_items([1, -0.125]), 0, 0).line_totals) == [-13]
+    assert list(compute_totals(_items([3, 0.335]), 0, 0).line_totals) == [101]
+
+def test_discount_rounds_half_away_from_zero(engine):
+    assert compute_totals(_items([1, 10]), 0, 0.125).discount == 13
+    assert compute_totals(_items([1, 10]), 0, 1.005).discount == 101
+
+def test_VAT_rounds_half_away_from_zero(engine):
+    # 0.25 * 20% = 0.05, 0.125 * 20% = 0.025 -> 0.03
+    assert compute_totals(_items([1, 0.125]), 20, 0).VAT == {20.0: 3}
+    assert compute_totals(_items([1, 10]), 5.5, 0).VAT == {5.5: 55}
+
+def test_total(engine):
+    result = compute_totals(_items([2, 9.99], [3, 10.99]), 20, 5)
+    assert result.subtotal == 5295
+    assert result.VAT_total == 1059
+    assert result.total == 5295 + 1059 - 500
+
+@pytest.mark.parametrize("rows", [
+    [[(i % 7) * 0.125 + 0.001 * i, 0.0001 * i + (i % 3) * 0.005] for i in range(2000)],
+    # quantity * price overflows 64-bit integers at the fixed point scales
+    [[1e6, 1e6]] * 300,
+    [[1, 1e6]] * 300 + [[1e9, 1e9]],
+])
+def test_engines_agree(monkeypatch, rows):
+    if totals.load_numpy() is None:
+        pytest.skip("NumPy is not installed")
+    items = _items(*rows)
+    with_numpy = compute_totals(items, 20, 1.5)
+    monkeypatch.setattr(totals, "NUMPY_MIN_ITEMS", items.item_count() + 1)
+    without_numpy = compute_totals(items, 20, 1.5)
+    assert list(with_numpy.line_totals) == without_numpy.line_totals
+    assert with_numpy.VAT == without_numpy.VAT
+    assert with_numpy.total == without_numpy.total
+
+def test_format():
+    assert format_amount(18930) == "189.30"
+    assert format_amount(-5) == "-0.05"
+    assert format_price(0.1534) == "0.1534"
+    assert format_price(9.9) == "9.90"
+    assert format_price(12) == "12.00"